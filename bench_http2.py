@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Benchmark de transporte: HTTP/1.1 con pool de conexiones vs HTTP/2 multiplexado.
+
+Levanta un servidor TLS local (certificado autofirmado generado con openssl) que
+negocia h2 o http/1.1 por ALPN y responde cada página tras una latencia fija,
+simulando el RTT de un sitio remoto. Después ejecuta el mismo crawl_website
+concurrente con MegaScraper(http2=False) y MegaScraper(http2=True) y compara
+tiempo total, páginas por segundo y conexiones TLS abiertas.
+
+Uso:
+    python bench_http2.py --pages 300 --workers 20 --latency 0.05
+
+Requiere httpx[http2] (h2 y h11 vienen con él) y el binario openssl.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import logging
+import os
+import ssl
+import subprocess
+import tempfile
+import threading
+import time
+import warnings
+
+import h11
+import h2.config
+import h2.connection
+import h2.events
+import requests
+
+from main import HAS_HTTP2, MegaScraper
+
+
+# ============================================================================
+# SERVIDOR TLS DE PRUEBA
+# ============================================================================
+
+def make_certificate(directory):
+    """Genera un certificado autofirmado para localhost; devuelve (cert, clave)."""
+    cert = os.path.join(directory, 'cert.pem')
+    key = os.path.join(directory, 'key.pem')
+    subprocess.run(['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1',
+                    '-subj', '/CN=localhost', '-keyout', key, '-out', cert],
+                   check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return cert, key
+
+
+class BenchServer:
+    """
+    Servidor HTTPS asíncrono con un árbol de páginas /p/<n>.
+
+    Cada página enlaza a sus `fanout` hijas, así el crawling siempre tiene
+    frontera para lotes concurrentes. Cuenta las conexiones TLS aceptadas.
+    """
+
+    def __init__(self, cert, key, latency=0.05, fanout=10, padding=2048):
+        self.latency = latency
+        self.fanout = fanout
+        self.padding = padding
+        self.connections = 0
+        self.protocols = {}
+        self.context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        self.context.load_cert_chain(cert, key)
+        self.context.set_alpn_protocols(['h2', 'http/1.1'])
+        self.loop = asyncio.new_event_loop()
+        self.port = None
+
+    def page(self, path):
+        try:
+            number = int(path.rstrip('/').rsplit('/', 1)[-1])
+        except ValueError:
+            return 404, b'not found'
+        links = ''.join('<a href="/p/{}">hija {}</a>'.format(number * self.fanout + i, i)
+                        for i in range(1, self.fanout + 1))
+        body = '<html><body><h1>Página {}</h1>{}<p>{}</p></body></html>'.format(
+            number, links, 'x' * self.padding)
+        return 200, body.encode('utf-8')
+
+    async def _serve_h2(self, reader, writer):
+        conn = h2.connection.H2Connection(config=h2.config.H2Configuration(client_side=False))
+        conn.initiate_connection()
+        writer.write(conn.data_to_send())
+
+        async def respond(stream_id, path):
+            await asyncio.sleep(self.latency)
+            status, body = self.page(path)
+            conn.send_headers(stream_id, [(':status', str(status)), ('content-type', 'text/html; charset=utf-8'),
+                                          ('content-length', str(len(body)))])
+            conn.send_data(stream_id, body, end_stream=True)
+            writer.write(conn.data_to_send())
+
+        while True:
+            data = await reader.read(65535)
+            if not data:
+                break
+            for event in conn.receive_data(data):
+                if isinstance(event, h2.events.RequestReceived):
+                    path = dict(event.headers).get(b':path', b'/').decode('ascii')
+                    asyncio.ensure_future(respond(event.stream_id, path))
+                elif isinstance(event, h2.events.ConnectionTerminated):
+                    writer.close()
+                    return
+            writer.write(conn.data_to_send())
+
+    async def _serve_h11(self, reader, writer):
+        conn = h11.Connection(h11.SERVER)
+        path = '/'
+        while True:
+            event = conn.next_event()
+            if event is h11.NEED_DATA:
+                conn.receive_data(await reader.read(65535))
+            elif isinstance(event, h11.Request):
+                path = event.target.decode('ascii')
+            elif isinstance(event, h11.EndOfMessage):
+                await asyncio.sleep(self.latency)
+                status, body = self.page(path)
+                writer.write(conn.send(h11.Response(status_code=status, headers=[
+                    ('content-type', 'text/html; charset=utf-8'), ('content-length', str(len(body)))])))
+                writer.write(conn.send(h11.Data(data=body)))
+                writer.write(conn.send(h11.EndOfMessage()))
+                await writer.drain()
+                if conn.our_state is h11.MUST_CLOSE:
+                    break
+                conn.start_next_cycle()
+            else:
+                break
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        protocol = writer.get_extra_info('ssl_object').selected_alpn_protocol() or 'http/1.1'
+        self.protocols[protocol] = self.protocols.get(protocol, 0) + 1
+        try:
+            if protocol == 'h2':
+                await self._serve_h2(reader, writer)
+            else:
+                await self._serve_h11(reader, writer)
+        except (ConnectionError, h11.RemoteProtocolError, ssl.SSLError):
+            pass
+        finally:
+            writer.close()
+
+    def start(self):
+        """Arranca el servidor en un hilo aparte y devuelve la URL base."""
+        started = threading.Event()
+
+        def run():
+            asyncio.set_event_loop(self.loop)
+            server = self.loop.run_until_complete(
+                asyncio.start_server(self._handle, '127.0.0.1', 0, ssl=self.context))
+            self.port = server.sockets[0].getsockname()[1]
+            started.set()
+            self.loop.run_forever()
+
+        threading.Thread(target=run, daemon=True).start()
+        started.wait()
+        return 'https://127.0.0.1:{}'.format(self.port)
+
+    def reset(self):
+        self.connections = 0
+        self.protocols = {}
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def run_crawl(base_url, server, http2, pages, workers):
+    """Ejecuta un crawling concurrente y devuelve (segundos, páginas, conexiones, protocolos)."""
+    server.reset()
+    scraper = MegaScraper(delay=0, verify_ssl=False, http2=http2, quiet=True)
+    # Sin esto REQUESTS_CA_BUNDLE/CURL_CA_BUNDLE anulan verify=False de la sesión
+    scraper.session.trust_env = False
+    # Pool HTTP/1.1 con una conexión por hilo: la comparación es con un pool bien dimensionado
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+    scraper.session.mount('https://', adapter)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        scraper.crawl_website(base_url + '/p/0', {'titulo': 'h1'}, max_pages=pages, depth=10,
+                              max_workers=workers)
+    elapsed = time.perf_counter() - start
+    scraper.close()
+    return elapsed, len(scraper.data), server.connections, dict(server.protocols)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP/1.1 con pool vs HTTP/2 multiplexado")
+    parser.add_argument('--pages', type=int, default=300, help="páginas por crawling")
+    parser.add_argument('--workers', type=int, default=20, help="descargas simultáneas")
+    parser.add_argument('--latency', type=float, default=0.05, help="latencia por respuesta (s)")
+    parser.add_argument('--rounds', type=int, default=3, help="repeticiones de cada modo")
+    args = parser.parse_args()
+
+    if not HAS_HTTP2:
+        raise SystemExit("HTTP/2 no disponible: pip install httpx[http2]")
+
+    warnings.filterwarnings('ignore', message='Unverified HTTPS request')
+    logging.getLogger('MegaScraper').setLevel(logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as directory:
+        server = BenchServer(*make_certificate(directory), latency=args.latency)
+        base_url = server.start()
+        print("Servidor TLS en {} (latencia {:.0f} ms, {} páginas, {} hilos)".format(
+            base_url, args.latency * 1000, args.pages, args.workers))
+        print("")
+        print("{:<22}{:>10}{:>12}{:>14}  {}".format("Transporte", "Tiempo", "Páginas/s", "Conexiones", "ALPN"))
+        print("-" * 72)
+
+        for label, http2 in (("HTTP/1.1 (pool)", False), ("HTTP/2 (multiplexado)", True)):
+            results = [run_crawl(base_url, server, http2, args.pages, args.workers)
+                       for _ in range(args.rounds)]
+            elapsed, fetched, connections, protocols = min(results, key=lambda r: r[0])
+            print("{:<22}{:>9.2f}s{:>12.1f}{:>14}  {}".format(
+                label, elapsed, fetched / elapsed, connections, protocols))
+
+        print("")
+        print("Mejor de {} rondas por modo.".format(args.rounds))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Benchmark de extracción de enlaces: árbol BeautifulSoup vs escaneo con scan_links.
+
+Genera páginas grandes con muchos enlaces (menús, listados, paginación, enlaces
+externos y relativos a un <base href>) y mide, por página, la ruta de enlaces de
+crawl_website en tres variantes:
+
+    - BeautifulSoup: construye el árbol y recorre find_all('a', href=True)
+    - scan_links (lxml): tokenizador SAX de lxml, sin árbol
+    - scan_links (html.parser): el mismo escaneo sin lxml
+
+Las tres incluyen el filtrado común (_filter_links, que conserva hasta 200 enlaces
+internos por página) y se comprueba que devuelven los mismos enlaces.
+
+Uso:
+    python bench_links.py --pages 50 --links 3000 --rounds 3
+
+lxml es opcional: sin él solo se comparan las variantes de BeautifulSoup y html.parser.
+"""
+
+import argparse
+import logging
+import random
+import time
+
+import main as megascraper
+from main import MegaScraper
+
+
+# ============================================================================
+# PÁGINAS DE PRUEBA
+# ============================================================================
+
+def make_page(rng, number, links, words=2000):
+    """Página de listado con `links` enlaces repartidos entre menú, fichas y pie."""
+    vocabulary = ['producto', 'oferta', 'envío', 'marca', 'precio', 'talla', 'color', 'stock']
+    parts = ['<!DOCTYPE html><html><head><title>Listado {}</title>'.format(number),
+             '<base href="/catalogo/">',
+             '<script>var page = {};</script></head><body>'.format(number),
+             '<header><nav><ul>']
+    menu = links // 10
+    for i in range(menu):
+        parts.append('<li><a href="/categoria/{}">Categoría {}</a></li>'.format(i, i))
+    parts.append('</ul></nav></header><main>')
+    for i in range(links - 2 * menu):
+        kind = rng.random()
+        if kind < 0.7:
+            href = 'item-{}-{}.html'.format(number, i)
+        elif kind < 0.85:
+            href = '/marca/{}?p={}&amp;orden=precio'.format(i % 50, i)
+        elif kind < 0.95:
+            href = 'https://externo{}.example/ref/{}'.format(i % 7, i)
+        else:
+            href = '#valoraciones'
+        text = ' '.join(rng.choice(vocabulary) for _ in range(words // links + 1))
+        parts.append('<div class="ficha"><a href="{}"><img src="/img/{}.jpg" alt="">'
+                     '<span>{}</span></a><p>{}</p></div>'.format(href, i, i, text))
+    parts.append('</main><footer>')
+    for i in range(menu):
+        parts.append('<a href="?page={}">{}</a> '.format(i + 1, i + 1))
+    parts.append('</footer></body></html>')
+    return ''.join(parts).encode('utf-8')
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def soup_links(scraper, url, content):
+    return scraper._extract_page_links(scraper._parse(content), url)
+
+
+def scan_links_lxml(scraper, url, content):
+    megascraper.HAS_LXML = True
+    return scraper._extract_page_links(None, url, content=content)
+
+
+def scan_links_stdlib(scraper, url, content):
+    megascraper.HAS_LXML = False
+    return scraper._extract_page_links(None, url, content=content)
+
+
+def run_variant(extract, pages, rounds):
+    """Devuelve (mejor tiempo total en segundos, enlaces por página) de una variante."""
+    scraper = MegaScraper(delay=0, quiet=True)
+    best = None
+    results = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        results = [extract(scraper, url, content) for url, content in pages]
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    scraper.close()
+    return best, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Enlaces con BeautifulSoup vs scan_links")
+    parser.add_argument('--pages', type=int, default=50, help="páginas generadas")
+    parser.add_argument('--links', type=int, default=3000, help="enlaces por página")
+    parser.add_argument('--rounds', type=int, default=3, help="repeticiones de cada variante")
+    parser.add_argument('--seed', type=int, default=1, help="semilla de las páginas")
+    args = parser.parse_args()
+
+    logging.getLogger('MegaScraper').setLevel(logging.ERROR)
+    has_lxml = megascraper.HAS_LXML
+
+    rng = random.Random(args.seed)
+    pages = [('https://tienda.example/listado/{}'.format(n), make_page(rng, n, args.links))
+             for n in range(args.pages)]
+    size = sum(len(content) for _, content in pages) / len(pages)
+    print("{} páginas de {:.0f} KB con {} enlaces cada una".format(args.pages, size / 1024, args.links))
+    print("")
+    print("{:<28}{:>12}{:>12}{:>12}{:>10}".format("Ruta", "Total (s)", "ms/página", "Enlaces", "Veces"))
+    print("-" * 74)
+
+    variants = [("BeautifulSoup", soup_links)]
+    if has_lxml:
+        variants.append(("scan_links (lxml)", scan_links_lxml))
+    variants.append(("scan_links (html.parser)", scan_links_stdlib))
+
+    try:
+        baseline = None
+        reference = None
+        for label, extract in variants:
+            elapsed, results = run_variant(extract, pages, args.rounds)
+            if reference is None:
+                baseline, reference = elapsed, results
+            elif results != reference:
+                raise SystemExit("{} devuelve enlaces distintos de BeautifulSoup".format(label))
+            print("{:<28}{:>12.3f}{:>12.2f}{:>12}{:>9.1f}x".format(
+                label, elapsed, 1000.0 * elapsed / len(pages), len(results[0]), baseline / elapsed))
+    finally:
+        megascraper.HAS_LXML = has_lxml
+
+    print("")
+    print("Mejor de {} rondas por variante; 'Veces' es la aceleración sobre BeautifulSoup.".format(args.rounds))
+    if not has_lxml:
+        print("lxml no está instalado: pip install lxml para la variante más rápida.")
+
+
+if __name__ == '__main__':
+    main()
@@ -10,16 +10,38 @@ Licencia: MIT
 """
 
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, NavigableString
 import time
 import random
 import json
 import csv
 import logging
+import logging.handlers
+import queue
+import atexit
 import sys
 import os
-from urllib.parse import urlparse, urljoin
-from concurrent.futures import ThreadPoolExecutor
+import io
+import gzip
+import hashlib
+import heapq
+import re
+import sqlite3
+import uuid
+import html
+import textwrap
+import cProfile
+import pstats
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+import xml.etree.ElementTree as ET
+from urllib.parse import urlparse, urljoin, urlsplit
+from urllib.robotparser import RobotFileParser
+import itertools
+from collections import Counter, deque
+from functools import lru_cache
+from html.parser import HTMLParser
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 import threading
 
 try:
@@ -34,23 +56,1023 @@ try:
 except ImportError:
     HAS_PANDAS = False
 
-# Configuración de logging
+try:
+    from lxml import etree as lxml_etree
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+try:
+    import httpx
+    import h2  # noqa: F401  (httpx necesita h2 para negociar HTTP/2)
+    HAS_HTTP2 = True
+except ImportError:
+    HAS_HTTP2 = False
+
+# Codificaciones que urllib3 sabe descomprimir (br/zstd solo si brotli/zstandard están instalados)
+try:
+    from urllib3.util.request import ACCEPT_ENCODING as _URLLIB3_ENCODINGS
+except ImportError:
+    _URLLIB3_ENCODINGS = "gzip,deflate"
+_ENCODING_PREFERENCE = ['br', 'zstd', 'gzip', 'deflate']
+ACCEPT_ENCODING = ', '.join(
+    enc for enc in _ENCODING_PREFERENCE
+    if enc in [e.strip() for e in _URLLIB3_ENCODINGS.split(',')]
+)
+
+# httpx tiene sus propios decodificadores (zstd solo desde 0.27.1): por HTTP/2 se
+# anuncian únicamente las codificaciones que ambos saben descomprimir
+HTTP2_ACCEPT_ENCODING = None
+if HAS_HTTP2:
+    try:
+        from httpx._decoders import SUPPORTED_DECODERS as _HTTPX_DECODERS
+    except ImportError:
+        _HTTPX_DECODERS = ('gzip', 'deflate')
+    HTTP2_ACCEPT_ENCODING = ', '.join(
+        enc for enc in _ENCODING_PREFERENCE
+        if enc in _HTTPX_DECODERS and enc in ACCEPT_ENCODING.split(', ')
+    )
+
+# Errores de red que justifican un reintento en fetch_url
+FETCH_ERRORS = (requests.exceptions.RequestException,)
+if HAS_HTTP2:
+    FETCH_ERRORS += (httpx.HTTPError,)
+
+# Respuestas definitivas: la página no existe y reintentar no sirve de nada
+GONE_STATUSES = (404, 410)
+
+# robots.txt equivalente a un 401/403: prohíbe todo el host
+ROBOTS_DISALLOW_ALL = "User-agent: *\nDisallow: /\n"
+
+# Configuración de logging: los hilos solo encolan registros y un hilo de fondo
+# escribe en scraper.log y en consola, para que la E/S no bloquee el crawling
+_log_queue = queue.Queue(-1)
+_log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+_log_file_handler = logging.FileHandler("scraper.log")
+_log_file_handler.setFormatter(_log_formatter)
+_log_console_handler = logging.StreamHandler()
+_log_console_handler.setFormatter(_log_formatter)
+log_listener = logging.handlers.QueueListener(
+    _log_queue, _log_file_handler, _log_console_handler, respect_handler_level=True)
+_log_queue_handler = logging.handlers.QueueHandler(_log_queue)
+_log_queue_handler.setFormatter(logging.Formatter('%(message)s'))
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("scraper.log"),
-        logging.StreamHandler()
-    ]
+    handlers=[_log_queue_handler]
 )
+log_listener.start()
+atexit.register(log_listener.stop)
 logger = logging.getLogger("MegaScraper")
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+# ============================================================================
+# PROGRESO Y MUESTREO DE LOGS
+# ============================================================================
+
+class LogSampler:
+    """
+    Limita los mensajes repetidos por clave (por ejemplo host + tipo de error).
+
+    Deja pasar los primeros `burst` mensajes de cada clave y después como mucho
+    uno cada `interval` segundos, indicando cuántos se omitieron entre medias.
+    """
+
+    def __init__(self, interval=30.0, burst=3):
+        self.interval = interval
+        self.burst = burst
+        self.lock = threading.Lock()
+        self._state = {}
+
+    def check(self, key):
+        """Devuelve None si hay que omitir el mensaje, o el número de omitidos desde el último."""
+        now = time.time()
+        with self.lock:
+            count, last, suppressed = self._state.get(key, (0, 0.0, 0))
+            if count < self.burst or now - last >= self.interval:
+                self._state[key] = (count + 1, now, 0)
+                return suppressed
+            self._state[key] = (count, last, suppressed + 1)
+            return None
+
+    def log(self, level, key, message):
+        """Registra el mensaje si el muestreo lo permite."""
+        suppressed = self.check(key)
+        if suppressed is None:
+            return
+        if suppressed:
+            message = "{} (+{} similares omitidos)".format(message, suppressed)
+        logger.log(level, message)
+
+
+class ProgressReporter:
+    """Estado agregado periódico (páginas, velocidad, errores, ETA) en vez de una línea por URL."""
+
+    def __init__(self, total=None, interval=2.0, label="páginas"):
+        self.total = total
+        self.interval = interval
+        self.label = label
+        self.done = 0
+        self.errors = 0
+        self.start = time.time()
+        self.stopped_at = None
+        self.lock = threading.Lock()
+        self._last = self.start
+        self._shown = None
+        self._is_tty = sys.stdout.isatty()
+
+    def tick(self):
+        """Cuenta una URL procesada y muestra el estado si toca."""
+        with self.lock:
+            self.done += 1
+            now = time.time()
+            if now - self._last >= self.interval:
+                self._last = now
+                self._show(now)
+
+    def error(self):
+        with self.lock:
+            self.errors += 1
+
+    def status(self, now=None):
+        """Línea de estado con el progreso actual."""
+        elapsed = max((self.stopped_at or now or time.time()) - self.start, 1e-6)
+        rate = self.done / elapsed
+        line = "[*] {}{} {} · {:.1f}/s · {} errores".format(
+            self.done, "/{}".format(self.total) if self.total else "", self.label, rate, self.errors)
+        if self.total and rate > 0:
+            line += " · ETA {:.0f}s".format(max(self.total - self.done, 0) / rate)
+        return line
+
+    def _show(self, now, final=False):
+        line = self.status(now)
+        if final and not self._is_tty and self._shown == (self.done, self.errors):
+            return
+        self._shown = (self.done, self.errors)
+        if self._is_tty:
+            sys.stdout.write("\r" + line.ljust(79) + ("\n" if final else ""))
+            sys.stdout.flush()
+        else:
+            print(line)
+
+    def stop(self):
+        """Congela el tiempo transcurrido (la velocidad deja de bajar al terminar)."""
+        if self.stopped_at is None:
+            self.stopped_at = time.time()
+
+    def finish(self):
+        with self.lock:
+            self.stop()
+            self._show(time.time(), final=True)
+
+
+# ============================================================================
+# PERFILADO DE CRAWLINGS
+# ============================================================================
+
+# Contexto vacío (reutilizable) para las mediciones con el perfilado desactivado
+_NO_PROFILE = nullcontext()
+
+
+class CrawlProfiler:
+    """
+    Acumula el tiempo de cada etapa de un crawling.
+
+    Las claves son etapas ('parseo', 'enlaces'...) o selectores concretos
+    ('selector titulo: h1'), para ver cuál domina el coste. Las etapas de CPU
+    se miden con time.thread_time() (CPU del hilo, sin esperas ni GIL); las de
+    espera (wait=True: red, pausas de cortesía) con reloj de pared y se
+    muestran aparte, fuera del ranking. Una etapa de CPU anidada en otra (el
+    parseo perezoso dentro de un selector) solo cuenta en la interior, así los
+    porcentajes suman 100%. Con dump_dir también se guarda un volcado de
+    cProfile de todos los hilos y una instantánea de tracemalloc.
+    """
+
+    def __init__(self, dump_dir=None):
+        self.dump_dir = dump_dir
+        self.lock = threading.Lock()
+        self.stats = {}
+        self.waits = {}
+        self._profiles = []
+        self._local = threading.local()
+
+    @contextmanager
+    def measure(self, key, wait=False):
+        clock = time.perf_counter if wait else time.thread_time
+        if not wait:
+            # Pila por hilo: cada etapa acumula el tiempo de sus etapas anidadas
+            stack = getattr(self._local, 'stack', None)
+            if stack is None:
+                stack = self._local.stack = []
+            stack.append(0.0)
+        start = clock()
+        try:
+            yield
+        finally:
+            elapsed = clock() - start
+            if not wait:
+                nested = stack.pop()
+                if stack:
+                    stack[-1] += elapsed
+                elapsed -= nested
+            with self.lock:
+                table = self.waits if wait else self.stats
+                entry = table.get(key)
+                if entry is None:
+                    table[key] = [1, elapsed]
+                else:
+                    entry[0] += 1
+                    entry[1] += elapsed
+
+    def begin_run(self):
+        """Reinicia las mediciones y arranca cProfile/tracemalloc si hay volcado."""
+        with self.lock:
+            self.stats = {}
+            self.waits = {}
+        if self.dump_dir:
+            os.makedirs(self.dump_dir, exist_ok=True)
+            tracemalloc.start()
+            profile = cProfile.Profile()
+            profile.enable()
+            self._profiles = [profile]
+            # cProfile solo ve el hilo que lo activa: los hilos que arranquen a
+            # partir de aquí (los workers) activan el suyo en su primer evento
+            threading.setprofile(self._profile_thread)
+
+    def _profile_thread(self, frame, event, arg):
+        """Gancho de threading.setprofile: sustituye el gancho por un cProfile del hilo."""
+        sys.setprofile(None)
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            return  # Python 3.12+: el cProfile del hilo principal ya ve todos los hilos
+        with self.lock:
+            self._profiles.append(profile)
+
+    def end_run(self, name="crawl"):
+        """Detiene el perfilado, guarda los volcados y muestra la tabla de costes.
+
+        Debe llamarse cuando los hilos de trabajo ya han terminado: los perfiles de
+        cada hilo se combinan en un único .prof.
+        """
+        if self._profiles:
+            threading.setprofile(None)
+            self._profiles[0].disable()
+            with self.lock:
+                profiles, self._profiles = self._profiles, []
+            merged = pstats.Stats(profiles[0])
+            for profile in profiles[1:]:
+                merged.add(profile)
+            stamp = time.strftime('%Y%m%d-%H%M%S')
+            prof_path = os.path.join(self.dump_dir, "{}-{}.prof".format(name, stamp))
+            merged.dump_stats(prof_path)
+            snapshot_path = os.path.join(self.dump_dir, "{}-{}.tracemalloc".format(name, stamp))
+            tracemalloc.take_snapshot().dump(snapshot_path)
+            tracemalloc.stop()
+            print("[+] Perfil de {} hilos guardado en {} y {}".format(len(profiles), prof_path, snapshot_path))
+        self.print_report()
+
+    def print_report(self, limit=25):
+        """Muestra las etapas de CPU ordenadas por tiempo total y, aparte, las esperas."""
+        with self.lock:
+            rows = sorted(self.stats.items(), key=lambda item: item[1][1], reverse=True)
+            waits = sorted(self.waits.items(), key=lambda item: item[1][1], reverse=True)
+        if not rows and not waits:
+            return
+        grand_total = sum(total for _, (_, total) in rows) or 1e-9
+        print("\n>>> COSTE DE CPU POR ETAPA Y SELECTOR")
+        print("{:<48} {:>9} {:>10} {:>10} {:>6}".format("Etapa", "Llamadas", "CPU (s)", "Media (ms)", "%"))
+        print("-" * 87)
+        for key, (count, total) in rows[:limit]:
+            print("{:<48} {:>9} {:>10.3f} {:>10.3f} {:>5.1f}%".format(
+                key[:48], count, total, 1000.0 * total / count, 100.0 * total / grand_total))
+        if waits:
+            print("-" * 87)
+            for key, (count, total) in waits:
+                print("{:<48} {:>9} {:>10.3f} {:>10.3f} {:>6}".format(
+                    key[:48], count, total, 1000.0 * total / count, "reloj"))
+
+
+# ============================================================================
+# EXTRACCIÓN RÁPIDA DE ENLACES
+# ============================================================================
+
+_SCHEME_RE = re.compile(r'^[a-zA-Z][a-zA-Z0-9+.-]*:')
+
+
+class _LinkCollector:
+    """Destino tipo SAX que guarda el primer <base href> y los href de los <a>."""
+
+    def __init__(self):
+        self.base = None
+        self.hrefs = []
+
+    def start(self, tag, attrib):
+        if tag == 'a':
+            href = attrib.get('href')
+            if href:
+                self.hrefs.append(href)
+        elif tag == 'base' and self.base is None:
+            self.base = attrib.get('href')
+
+    def end(self, tag):
+        pass
+
+    def data(self, data):
+        pass
+
+    def close(self):
+        return self
+
+
+class _StdlibLinkParser(HTMLParser):
+    """Tokenizador de html.parser que alimenta un _LinkCollector (si lxml no está instalado)."""
+
+    def __init__(self, collector):
+        HTMLParser.__init__(self, convert_charrefs=True)
+        self.collector = collector
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ('a', 'base'):
+            self.collector.start(tag, dict((k, v) for k, v in attrs if v is not None))
+
+    handle_startendtag = handle_starttag
+
+
+def scan_links(content):
+    """Recorre el HTML sin construir árbol y devuelve (base_href, [href de cada <a>])."""
+    collector = _LinkCollector()
+    if HAS_LXML:
+        parser = lxml_etree.HTMLParser(target=collector, recover=True)
+        try:
+            parser.feed(content)
+            parser.close()
+            return collector.base, collector.hrefs
+        except lxml_etree.LxmlError:
+            collector = _LinkCollector()
+
+    parser = _StdlibLinkParser(collector)
+    if isinstance(content, bytes):
+        content = content.decode('utf-8', errors='replace')
+    parser.feed(content)
+    parser.close()
+    return collector.base, collector.hrefs
+
+
+@lru_cache(maxsize=16384)
+def _url_host(url):
+    """netloc de una URL, cacheado porque los enlaces de navegación se repiten en cada página."""
+    return urlsplit(url).netloc
+
+
+# ============================================================================
+# HUELLAS DE CONTENIDO (DETECCIÓN DE DUPLICADOS)
+# ============================================================================
+
+# Partes de plantilla que se repiten en todas las páginas y no cuentan para la huella
+BOILERPLATE_TAGS = frozenset(('nav', 'header', 'footer', 'script', 'style', 'noscript', 'template'))
+
+
+def content_text(soup):
+    """Texto de la página sin navegación, cabecera, pie ni scripts (no modifica el árbol)."""
+    parts = []
+    stack = [soup]
+    while stack:
+        node = stack.pop()
+        if type(node) is NavigableString:
+            text = node.strip()
+            if text:
+                parts.append(text)
+            continue
+        for child in reversed(node.contents):
+            # Comentarios, doctype, etc. son subclases de NavigableString y se descartan
+            if type(child) is NavigableString or (child.name and child.name not in BOILERPLATE_TAGS):
+                stack.append(child)
+    return ' '.join(parts)
+
+
+def simhash(text, bits=64, shingle=3):
+    """Calcula la huella SimHash de un texto a partir de sus shingles de `shingle` palabras."""
+    words = re.findall(r'\w+', text.lower())
+    if len(words) > shingle:
+        tokens = [' '.join(words[i:i + shingle]) for i in range(len(words) - shingle + 1)]
+    else:
+        tokens = words
+    weights = [0] * bits
+    for token, count in Counter(tokens).items():
+        h = int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=bits // 8).digest(), 'big')
+        for i in range(bits):
+            if h >> i & 1:
+                weights[i] += count
+            else:
+                weights[i] -= count
+
+    fingerprint = 0
+    for i, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << i
+    return fingerprint
+
+
+class SimHashIndex:
+    """
+    Índice compacto de huellas para detectar páginas duplicadas o casi duplicadas.
+
+    Guarda un hash exacto por página y su SimHash de 64 bits repartido en bandas:
+    dos huellas a distancia de Hamming <= max_distance coinciden en al menos una
+    de las max_distance + 1 bandas, así que solo se comparan los candidatos de esas bandas.
+    """
+
+    def __init__(self, max_distance=3, bits=64):
+        self.max_distance = max_distance
+        self.bits = bits
+        self.num_bands = max_distance + 1
+        self.band_width = -(-bits // self.num_bands)
+        self.exact = {}
+        self.bands = [{} for _ in range(self.num_bands)]
+
+    def _band_keys(self, fingerprint):
+        mask = (1 << self.band_width) - 1
+        return [(fingerprint >> (i * self.band_width)) & mask for i in range(self.num_bands)]
+
+    def check_and_add(self, text, url):
+        """Devuelve ('exact'|'near', url_original) si el texto ya se vio; si no, lo indexa."""
+        digest = hashlib.sha1(text.encode('utf-8')).digest()
+        if digest in self.exact:
+            return 'exact', self.exact[digest]
+
+        fingerprint = simhash(text, self.bits)
+        keys = self._band_keys(fingerprint)
+        for band, key in zip(self.bands, keys):
+            for other, other_url in band.get(key, ()):
+                if bin(fingerprint ^ other).count('1') <= self.max_distance:
+                    return 'near', other_url
+
+        self.exact[digest] = url
+        for band, key in zip(self.bands, keys):
+            band.setdefault(key, []).append((fingerprint, url))
+        return None
+
+
+# ============================================================================
+# DATOS ESTRUCTURADOS (JSON-LD, JSON EMBEBIDO, MICRODATA)
+# ============================================================================
+
+# Prefijos de selector que se resuelven sin construir el DOM
+STRUCTURED_PREFIXES = ('jsonld:', 'json:', 'microdata:')
+
+_SCRIPT_RE = re.compile(rb'<script\b([^>]*)>(.*?)</script\s*>', re.S | re.I)
+_ATTR_RE = re.compile(rb'([\w:-]+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>]+))')
+_ITEMPROP_TAG_RE = re.compile(rb'<(\w+)(\s[^>]*?\bitemprop\s*=[^>]*)>', re.I)
+_TEXT_RUN_RE = re.compile(rb'([^<]*)</(\w+)\s*>')
+_JSONPATH_TOKEN_RE = re.compile(r"\.\.([\w@$-]+|\*)|\.([\w@$-]+|\*)|\[(\d+|\*|'[^']*'|\"[^\"]*\")\]")
+
+
+def is_structured_selector(selector):
+    """Indica si un selector usa JSON-LD, JSON embebido o microdata en vez de CSS."""
+    return selector.startswith(STRUCTURED_PREFIXES)
+
+
+def _json_children(node, key):
+    if key == '*':
+        if isinstance(node, dict):
+            return list(node.values())
+        return list(node) if isinstance(node, list) else []
+    if isinstance(node, dict):
+        return [node[key]] if key in node else []
+    if isinstance(node, list):
+        # Las listas se recorren de forma implícita (JSON-LD usa listas y @graph a menudo)
+        return [child for item in node for child in _json_children(item, key)]
+    return []
+
+
+def _json_descendants(node, key):
+    found = []
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, dict):
+            if key == '*':
+                found.extend(current.values())
+            elif key in current:
+                found.append(current[key])
+            stack.extend(reversed(list(current.values())))
+        elif isinstance(current, list):
+            stack.extend(reversed(current))
+    return found
+
+
+def jsonpath(data, path):
+    """Evalúa un subconjunto de JSONPath ($.a.b, $..a, [0], [*], ['a b']) y devuelve las coincidencias."""
+    path = path.strip()
+    if path.startswith('$'):
+        path = path[1:]
+    elif path and not path.startswith(('.', '[')):
+        path = '.' + path
+
+    nodes = [data]
+    position = 0
+    for match in _JSONPATH_TOKEN_RE.finditer(path):
+        if match.start() != position:
+            raise ValueError("JSONPath no válido: {}".format(path))
+        position = match.end()
+        deep, name, index = match.groups()
+        if deep:
+            nodes = [found for node in nodes for found in _json_descendants(node, deep)]
+        elif name:
+            nodes = [child for node in nodes for child in _json_children(node, name)]
+        elif index == '*':
+            nodes = [child for node in nodes for child in _json_children(node, '*')]
+        elif index.isdigit():
+            i = int(index)
+            nodes = [node[i] for node in nodes if isinstance(node, list) and i < len(node)]
+        else:
+            nodes = [child for node in nodes for child in _json_children(node, index[1:-1])]
+    if position != len(path):
+        raise ValueError("JSONPath no válido: {}".format(path))
+    return nodes
+
+
+class StructuredData:
+    """
+    Lector de datos estructurados de una página a nivel de bytes.
+
+    Localiza los bloques <script> con expresiones regulares, sin construir el
+    DOM, y resuelve selectores del tipo:
+
+        jsonld:$.offers.price               JSONPath sobre los bloques application/ld+json
+        json:__NEXT_DATA__:$.props.title    JSONPath sobre el <script id="..."> indicado
+        microdata:price                     elementos con itemprop="price"
+
+    El texto de un elemento microdata con marcado interno se obtiene del DOM,
+    que solo se construye (con parse) si hace falta.
+    """
+
+    def __init__(self, content, soup=None, parse=None):
+        self.content = content
+        self.soup = soup
+        self._parse = parse
+        self._jsonld = None
+        self._scripts_by_id = None
+
+    def _dom(self):
+        if self.soup is None:
+            self.soup = self._parse(self.content) if self._parse else BeautifulSoup(self.content, 'html.parser')
+        return self.soup
+
+    def _scan_scripts(self):
+        self._jsonld = []
+        self._scripts_by_id = {}
+        for match in _SCRIPT_RE.finditer(self.content):
+            attrs = {}
+            for attr in _ATTR_RE.finditer(match.group(1)):
+                value = attr.group(2) or attr.group(3) or attr.group(4) or b''
+                attrs[attr.group(1).lower().decode('ascii', errors='replace')] = value.decode('utf-8', errors='replace')
+            body = match.group(2)
+            if attrs.get('type', '').lower() == 'application/ld+json':
+                try:
+                    self._jsonld.append(json.loads(body.decode('utf-8', errors='replace')))
+                except ValueError:
+                    logger.warning("[!] Bloque JSON-LD no válido")
+            if 'id' in attrs:
+                self._scripts_by_id[attrs['id']] = body
+
+    def _embedded_json(self, script_id):
+        body = self._scripts_by_id.get(script_id)
+        if body is None:
+            return None
+        if not isinstance(body, bytes):
+            return body
+        try:
+            parsed = json.loads(body.decode('utf-8', errors='replace'))
+        except ValueError:
+            parsed = None
+        self._scripts_by_id[script_id] = parsed
+        return parsed
+
+    def _microdata(self, prop):
+        token = prop.encode('utf-8')
+        values = []
+        for match in _ITEMPROP_TAG_RE.finditer(self.content):
+            attrs = {}
+            for attr in _ATTR_RE.finditer(match.group(2)):
+                attrs[attr.group(1).lower()] = attr.group(2) or attr.group(3) or attr.group(4) or b''
+            # itemprop es una lista de nombres separados por espacios
+            if token not in attrs.get(b'itemprop', b'').split():
+                continue
+            tag = match.group(1).lower()
+            if b'content' in attrs:
+                raw = attrs[b'content']
+            elif tag in (b'a', b'link') and b'href' in attrs:
+                raw = attrs[b'href']
+            elif tag in (b'img', b'audio', b'video', b'source') and b'src' in attrs:
+                raw = attrs[b'src']
+            else:
+                text = _TEXT_RUN_RE.match(self.content, match.end())
+                if text is None or text.group(2).lower() != tag:
+                    # Hay marcado dentro del elemento: el texto se toma del DOM
+                    return self._microdata_dom(prop)
+                raw = text.group(1)
+            value = html.unescape(raw.decode('utf-8', errors='replace')).strip()
+            if value:
+                values.append(value)
+        return values
+
+    def _microdata_dom(self, prop):
+        values = []
+        for element in self._dom().find_all(attrs={'itemprop': True}):
+            names = element['itemprop']
+            if prop not in (names.split() if isinstance(names, str) else names):
+                continue
+            if element.has_attr('content'):
+                value = element['content']
+            elif element.name in ('a', 'link') and element.has_attr('href'):
+                value = element['href']
+            elif element.name in ('img', 'audio', 'video', 'source') and element.has_attr('src'):
+                value = element['src']
+            else:
+                value = element.get_text(strip=True)
+            value = value.strip()
+            if value:
+                values.append(value)
+        return values
+
+    def resolve(self, selector):
+        """Devuelve la lista de valores que coinciden con un selector estructurado."""
+        if self._jsonld is None and selector.startswith(('jsonld:', 'json:')):
+            self._scan_scripts()
+
+        if selector.startswith('jsonld:'):
+            matches = []
+            for block in self._jsonld:
+                matches.extend(jsonpath(block, selector[len('jsonld:'):]))
+        elif selector.startswith('json:'):
+            script_id, _, path = selector[len('json:'):].partition(':')
+            document = self._embedded_json(script_id)
+            matches = jsonpath(document, path or '$') if document is not None else []
+        else:
+            return self._microdata(selector[len('microdata:'):].strip())
+
+        return [value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
+                for value in matches if value is not None]
+
+
+# ============================================================================
+# ALMACÉN COMPACTO DE REGISTROS
+# ============================================================================
+
+class RecordStore:
+    """
+    Lista compacta de registros con un esquema de campos fijo por trabajo.
+
+    Cada registro se guarda como una tupla en el orden de `fields` en lugar de un
+    dict, y los textos cortos se internan para que los valores repetidos (categorías,
+    marcas, 'En stock'...) compartan un único objeto. Se comporta como una lista de
+    dicts: append, extend, len, índices, slices e iteración devuelven dicts.
+    """
+
+    # Textos más largos que esto (descripciones) rara vez se repiten: no se internan
+    MAX_INTERN_LENGTH = 64
+
+    def __init__(self, fields=('url',)):
+        self.fields = list(fields)
+        self._positions = {field: i for i, field in enumerate(self.fields)}
+        self._rows = []
+
+    def _compact(self, value):
+        if isinstance(value, str):
+            return sys.intern(value) if len(value) <= self.MAX_INTERN_LENGTH else value
+        if isinstance(value, list):
+            return tuple(self._compact(item) for item in value)
+        return value
+
+    def append(self, record):
+        """Añade un registro (dict); los campos nuevos amplían el esquema."""
+        for field in record:
+            if field not in self._positions:
+                self._positions[field] = len(self.fields)
+                self.fields.append(field)
+        row = [None] * len(self.fields)
+        for field, value in record.items():
+            row[self._positions[field]] = self._compact(value)
+        self._rows.append(tuple(row))
+
+    def extend(self, records):
+        for record in records:
+            self.append(record)
+
+    def iter_rows(self):
+        """Recorre los registros como tuplas en el orden de `fields` (listas restauradas)."""
+        width = len(self.fields)
+        for row in self._rows:
+            if len(row) < width:
+                row = row + (None,) * (width - len(row))
+            yield tuple(list(value) if isinstance(value, tuple) else value for value in row)
+
+    def _to_dict(self, row):
+        record = {}
+        for field, value in zip(self.fields, row):
+            record[field] = list(value) if isinstance(value, tuple) else value
+        for field in self.fields[len(row):]:
+            record[field] = None
+        return record
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __iter__(self):
+        for row in self._rows:
+            yield self._to_dict(row)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._to_dict(row) for row in self._rows[index]]
+        return self._to_dict(self._rows[index])
+
+    def memory_report(self, sample=1000):
+        """Estima los bytes por registro del almacén frente a una lista de dicts equivalente."""
+        if not self._rows:
+            return {'records': 0, 'bytes_per_record': 0, 'dict_bytes_per_record': 0}
+        step = max(len(self._rows) // sample, 1)
+        rows = self._rows[::step]
+        seen = set()
+        compact = as_dicts = 0
+        for row in rows:
+            compact += sys.getsizeof(row)
+            as_dicts += sys.getsizeof(self._to_dict(row))
+            for value in row:
+                items = value if isinstance(value, tuple) else (value,)
+                if isinstance(value, tuple):
+                    compact += sys.getsizeof(value)
+                    as_dicts += sys.getsizeof(list(value))
+                for item in items:
+                    size = sys.getsizeof(item) if item is not None else 0
+                    as_dicts += size
+                    if id(item) not in seen:
+                        seen.add(id(item))
+                        compact += size
+        return {
+            'records': len(self._rows),
+            'bytes_per_record': compact // len(rows),
+            'dict_bytes_per_record': as_dicts // len(rows),
+        }
+
+    def log_memory(self):
+        report = self.memory_report()
+        if report['records']:
+            logger.info("[+] Memoria de registros: ~{} bytes/registro (~{} como dicts), {} registros".format(
+                report['bytes_per_record'], report['dict_bytes_per_record'], report['records']))
+
+
+# ============================================================================
+# ESTADO PARA RECRAWL INCREMENTAL
+# ============================================================================
+
+class RecordStateStore:
+    """
+    Estado local (SQLite) del último registro extraído de cada URL.
+
+    Guarda un hash del registro y cuándo se comprobó, para emitir solo los
+    registros nuevos, modificados o eliminados entre ejecuciones. Cada URL tiene
+    su propio intervalo de recrawl, que se duplica mientras el registro no cambia
+    (hasta max_backoff veces el intervalo base) y vuelve al base cuando cambia.
+    """
+
+    def __init__(self, path, max_backoff=8):
+        self.path = path
+        self.max_backoff = max_backoff
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS records ("
+            "url TEXT PRIMARY KEY, hash TEXT, checked REAL, backoff INTEGER)"
+        )
+        self.conn.commit()
+
+    @staticmethod
+    def record_hash(record):
+        """Hash estable del contenido de un registro."""
+        payload = json.dumps(record, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def load(self):
+        """Devuelve {url: (hash, checked, backoff)} con todo el estado guardado."""
+        cursor = self.conn.execute("SELECT url, hash, checked, backoff FROM records")
+        return {url: (h, checked, backoff) for url, h, checked, backoff in cursor}
+
+    def is_due(self, state, recrawl_interval, now=None):
+        """Indica si una URL con el estado dado debe volver a visitarse."""
+        if not recrawl_interval or state is None:
+            return True
+        now = now or time.time()
+        _, checked, backoff = state
+        return now - checked >= recrawl_interval * (backoff or 1)
+
+    def save(self, updates, removed=()):
+        """Aplica en una transacción las filas (url, hash, checked, backoff) y los borrados."""
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO records (url, hash, checked, backoff) VALUES (?, ?, ?, ?)",
+                updates)
+            self.conn.executemany("DELETE FROM records WHERE url = ?", [(url,) for url in removed])
+
+    def close(self):
+        self.conn.close()
+
+
+# ============================================================================
+# ARCHIVO WARC DE RESPUESTAS
+# ============================================================================
+
+class ArchivedResponse:
+    """Respuesta leída de un archivo WARC con la interfaz mínima de requests.Response."""
+
+    def __init__(self, url, status_code, headers, content):
+        self.url = url
+        self.status_code = status_code
+        self.headers = requests.structures.CaseInsensitiveDict(headers)
+        self.content = content
+
+    @property
+    def text(self):
+        content_type = self.headers.get('Content-Type', '')
+        encoding = 'utf-8'
+        if 'charset=' in content_type:
+            encoding = content_type.split('charset=', 1)[1].split(';')[0].strip() or encoding
+        try:
+            return self.content.decode(encoding, errors='replace')
+        except LookupError:
+            return self.content.decode('utf-8', errors='replace')
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError("{} archivado para {}".format(self.status_code, self.url))
+
+
+class WarcArchive:
+    """
+    Archivo rotativo de respuestas HTTP en formato WARC comprimido.
+
+    Cada registro es un miembro gzip independiente, así que puede leerse
+    directamente desde su offset. index.tsv guarda url, archivo, offset y
+    longitud de cada registro. Cada instancia escribe en sus propios archivos
+    (pid + uuid en el nombre), así varias pueden compartir directorio.
+    """
+
+    INDEX_NAME = 'index.tsv'
+
+    def __init__(self, directory, max_file_size=100 * 1024 * 1024):
+        self.directory = directory
+        self.max_file_size = max_file_size
+        self.lock = threading.Lock()
+        self._prefix = '{}-{}-{}'.format(time.strftime('%Y%m%d%H%M%S'), os.getpid(), uuid.uuid4().hex[:8])
+        self._sequence = 0
+        self._file = None
+        self._filename = None
+        os.makedirs(directory, exist_ok=True)
+        self._index = open(os.path.join(directory, self.INDEX_NAME), 'a', encoding='utf-8')
+
+    def _open_next(self):
+        if self._file is not None:
+            self._file.close()
+        self._sequence += 1
+        self._filename = 'scraper-{}-{:05d}.warc.gz'.format(self._prefix, self._sequence)
+        self._file = open(os.path.join(self.directory, self._filename), 'ab')
+
+    def write_response(self, url, status_code, reason, headers, body):
+        """Añade una respuesta (cabeceras y cuerpo ya descomprimido) al archivo."""
+        http_headers = ''.join(
+            '{}: {}\r\n'.format(k, v) for k, v in headers.items()
+            if k.lower() not in ('content-encoding', 'transfer-encoding', 'content-length'))
+        block = 'HTTP/1.1 {} {}\r\n{}Content-Length: {}\r\n\r\n'.format(
+            status_code, reason or '', http_headers, len(body)).encode('utf-8', errors='replace') + body
+        warc_headers = (
+            'WARC/1.1\r\n'
+            'WARC-Type: response\r\n'
+            'WARC-Target-URI: {}\r\n'
+            'WARC-Date: {}\r\n'
+            'WARC-Record-ID: <urn:uuid:{}>\r\n'
+            'Content-Type: application/http; msgtype=response\r\n'
+            'Content-Length: {}\r\n\r\n'
+        ).format(url, time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()), uuid.uuid4(), len(block))
+        record = gzip.compress(warc_headers.encode('utf-8') + block + b'\r\n\r\n')
+
+        with self.lock:
+            if self._file is None or self._file.tell() >= self.max_file_size:
+                self._open_next()
+            offset = self._file.tell()
+            self._file.write(record)
+            self._file.flush()
+            self._index.write('{}\t{}\t{}\t{}\n'.format(url, self._filename, offset, len(record)))
+            self._index.flush()
+
+    def close(self):
+        with self.lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self._index.close()
+
+    @staticmethod
+    def _read_record(stream):
+        """Lee el siguiente registro WARC de un flujo; devuelve None al final."""
+        line = stream.readline()
+        while line in (b'\r\n', b'\n'):
+            line = stream.readline()
+        if not line:
+            return None
+
+        warc_headers = {}
+        for line in iter(stream.readline, b''):
+            if line in (b'\r\n', b'\n'):
+                break
+            key, _, value = line.decode('utf-8', errors='replace').partition(':')
+            warc_headers[key.strip()] = value.strip()
+        block = stream.read(int(warc_headers.get('Content-Length', 0)))
+        return warc_headers, block
+
+    @staticmethod
+    def _parse_http(url, block):
+        head, _, body = block.partition(b'\r\n\r\n')
+        lines = head.decode('utf-8', errors='replace').split('\r\n')
+        status_code = int(lines[0].split(' ', 2)[1])
+        headers = {}
+        for line in lines[1:]:
+            key, _, value = line.partition(':')
+            headers[key.strip()] = value.strip()
+        return ArchivedResponse(url, status_code, headers, body)
+
+    @classmethod
+    def load_index(cls, directory):
+        """Devuelve {url: (archivo, offset, longitud)} con la respuesta más reciente de cada URL."""
+        index = {}
+        path = os.path.join(directory, cls.INDEX_NAME)
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    parts = line.rstrip('\n').split('\t')
+                    if len(parts) == 4:
+                        index[parts[0]] = (parts[1], int(parts[2]), int(parts[3]))
+        return index
+
+    @classmethod
+    def _read_at(cls, f, offset, length):
+        f.seek(offset)
+        warc_headers, block = cls._read_record(io.BytesIO(gzip.decompress(f.read(length))))
+        return cls._parse_http(warc_headers.get('WARC-Target-URI', ''), block)
+
+    @classmethod
+    def read_response(cls, directory, filename, offset, length):
+        """Lee una única respuesta usando su offset en el índice."""
+        with open(os.path.join(directory, filename), 'rb') as f:
+            return cls._read_at(f, offset, length)
+
+    @classmethod
+    def iter_indexed(cls, directory, filename, entries):
+        """Lee en orden de offset las respuestas indexadas [(offset, longitud), ...] de un archivo."""
+        with open(os.path.join(directory, filename), 'rb') as f:
+            for offset, length in sorted(entries):
+                yield cls._read_at(f, offset, length)
+
+
+def _init_worker_logging():
+    """En los procesos hijos se escribe el log directamente: el hilo de la cola solo vive en el padre."""
+    logging.getLogger().handlers = [_log_file_handler, _log_console_handler]
+
+
+def _replay_warc_file(directory, filename, entries, selectors, link_pattern, table_selector):
+    """Re-extrae datos, enlaces y tablas de un archivo WARC (se ejecuta en un proceso aparte).
+
+    Solo se leen los registros indicados en entries (los vigentes según el índice).
+    """
+    scraper = MegaScraper(delay=0)
+    data, links, tables = [], {}, {}
+    for response in WarcArchive.iter_indexed(directory, filename, entries):
+        try:
+            soup = None
+            if link_pattern or table_selector:
+                soup = BeautifulSoup(response.content, 'html.parser')
+            if selectors:
+                data.append(scraper._extract_fields(soup, response.url, selectors, content=response.content))
+            if link_pattern is not None:
+                links[response.url] = scraper._extract_page_links(soup, response.url, link_pattern or None,
+                                                                  content=response.content)
+            if table_selector:
+                found = scraper._extract_tables(soup, table_selector)
+                if found:
+                    tables[response.url] = found
+        except Exception as e:
+            logger.error("Error reprocesando {}: {}".format(response.url, str(e)[:50]))
+    return data, links, tables
+
 
 class MegaScraper:
     """
     Clase principal del Web Scraper con funcionalidades avanzadas.
     """
     
-    def __init__(self, use_proxies=False, delay=1.0, timeout=15, verify_ssl=True):
+    def __init__(self, use_proxies=False, delay=1.0, timeout=15, verify_ssl=True,
+                 http2=False, max_streams=100, cache_dir='.scraper_cache', cache_ttl=86400,
+                 archive_dir=None, replay_dir=None, quiet=False, profile=False, profile_dir=None):
         self.session = requests.Session()
         self.session.verify = verify_ssl
         self.delay = delay
@@ -60,6 +1082,50 @@ class MegaScraper:
         self.visited_urls = set()
         self.data = []
         self.lock = threading.Lock()
+
+        # Transporte HTTP/2 opcional: una conexión por host con streams multiplexados.
+        # Los semáforos de streams acompañan al cliente si se comparte (JobScheduler)
+        self.http2_client = None
+        self.max_streams = max_streams
+        self._stream_slots = {}
+
+        # Bytes transferidos por host: comprimidos (en la red) vs descomprimidos
+        self.transfer_stats = {}
+        self.request_count = 0
+        # URLs que respondieron 404/410 (sin reintentos); ver GONE_STATUSES
+        self.gone_urls = set()
+
+        # Caché en disco de robots.txt y sitemaps entre ejecuciones
+        self.cache_dir = cache_dir
+        self.cache_ttl = cache_ttl
+        self._robots = {}
+
+        # Archivo WARC de respuestas y modo de reproducción sin red
+        self.archive = WarcArchive(archive_dir) if archive_dir else None
+        self.replay_dir = replay_dir
+        self.replay_index = WarcArchive.load_index(replay_dir) if replay_dir else None
+
+        # Modo silencioso: progreso agregado en vez de una línea por URL
+        self.quiet = quiet
+        self._url_log_level = logging.DEBUG if quiet else logging.INFO
+        self.log_sampler = LogSampler()
+
+        # Perfilado opcional de etapas y selectores
+        self.profiler = CrawlProfiler(profile_dir) if (profile or profile_dir) else None
+
+        # Presupuesto del crawling en curso: las descargas ajustan a él timeout y reintentos
+        self.budget = None
+        if http2:
+            if HAS_HTTP2:
+                self.http2_client = httpx.Client(
+                    http2=True,
+                    verify=verify_ssl,
+                    timeout=timeout,
+                    follow_redirects=True,
+                    limits=httpx.Limits(max_connections=None, max_keepalive_connections=20)
+                )
+            else:
+                logger.warning("[!] HTTP/2 no disponible (pip install httpx[http2]), usando HTTP/1.1")
         
         # User agents predefinidos
         self.user_agents = [
@@ -130,6 +1196,7 @@ class MegaScraper:
             'User-Agent': user_agent,
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.5',
+            'Accept-Encoding': ACCEPT_ENCODING,
             'Referer': 'https://www.google.com/',
             'DNT': '1',
             'Connection': 'keep-alive',
@@ -139,33 +1206,165 @@ class MegaScraper:
         self.session.headers.update(headers)
         return headers
 
-    def fetch_url(self, url, max_retries=3, method="GET", data=None, params=None, json_data=None):
-        """Obtiene contenido de una URL con manejo de errores."""
+    def _get_stream_slot(self, host):
+        """Devuelve el semáforo que limita los streams HTTP/2 simultáneos por host."""
+        slot = self._stream_slots.get(host)
+        if slot is None:
+            # setdefault es atómico: dos scrapers que comparten el dict obtienen el mismo semáforo
+            slot = self._stream_slots.setdefault(host, threading.BoundedSemaphore(self.max_streams))
+        return slot
+
+    def _fetch_http2(self, url, method, headers, data=None, params=None, json_data=None, timeout=None):
+        """Envía una petición por el cliente HTTP/2 multiplexado."""
+        # Las cabeceras de conexión no están permitidas en HTTP/2
+        headers = {k: v for k, v in headers.items() if k.lower() != 'connection'}
+        headers['Accept-Encoding'] = HTTP2_ACCEPT_ENCODING
+        with self._get_stream_slot(urlparse(url).netloc):
+            return self.http2_client.request(method.upper(), url, headers=headers, params=params,
+                                             data=data, json=json_data,
+                                             timeout=timeout if timeout is not None else self.timeout)
+
+    def _timed(self, key, *args, wait=False):
+        """Contexto que mide una etapa si el perfilado está activo.
+
+        La clave se formatea con args solo al perfilar, para no construirla en cada
+        campo y página cuando el perfilado está desactivado.
+        """
+        if self.profiler is None:
+            return _NO_PROFILE
+        return self.profiler.measure(key.format(*args) if args else key, wait=wait)
+
+    def _parse(self, content):
+        """Construye el árbol BeautifulSoup de una página."""
+        with self._timed('parseo HTML'):
+            return BeautifulSoup(content, 'html.parser')
+
+    def _record_transfer(self, url, response, content_bytes=None):
+        """Acumula los bytes en la red y descomprimidos de una respuesta por host.
+
+        En respuestas leídas en streaming se indica content_bytes para no tocar response.content.
+        """
+        if content_bytes is None:
+            content_bytes = len(response.content)
+        if hasattr(response, 'num_bytes_downloaded'):
+            wire_bytes = response.num_bytes_downloaded  # httpx
+        else:
+            try:
+                wire_bytes = response.raw.tell()  # urllib3 cuenta los bytes leídos del socket
+            except Exception:
+                wire_bytes = 0
+        if not wire_bytes:
+            wire_bytes = content_bytes
+
+        host = urlparse(url).netloc
+        encoding = response.headers.get('Content-Encoding', 'identity')
+        with self.lock:
+            stats = self.transfer_stats.setdefault(host, {
+                'requests': 0, 'wire_bytes': 0, 'content_bytes': 0, 'encodings': {}})
+            stats['requests'] += 1
+            stats['wire_bytes'] += wire_bytes
+            stats['content_bytes'] += content_bytes
+            stats['encodings'][encoding] = stats['encodings'].get(encoding, 0) + 1
+
+    def total_wire_bytes(self):
+        """Bytes descargados en total (comprimidos, tal como viajan por la red)."""
+        with self.lock:
+            return sum(stats['wire_bytes'] for stats in self.transfer_stats.values())
+
+    def log_transfer_stats(self):
+        """Registra el resumen de bytes transferidos y el ahorro por compresión."""
+        for host, stats in sorted(self.transfer_stats.items()):
+            wire = stats['wire_bytes']
+            content = stats['content_bytes']
+            saved = 100.0 * (1 - float(wire) / content) if content else 0.0
+            logger.info("[+] {}: {} peticiones, {} KB en red, {} KB descomprimidos ({:.1f}% ahorro) {}".format(
+                host, stats['requests'], wire // 1024, content // 1024, saved, stats['encodings']))
+
+    def close(self):
+        """Cierra las conexiones abiertas del scraper."""
+        self.session.close()
+        if self.http2_client is not None:
+            self.http2_client.close()
+        if self.archive is not None:
+            self.archive.close()
+
+    def fetch_url(self, url, max_retries=3, method="GET", data=None, params=None, json_data=None,
+                  speculative=False):
+        """Obtiene contenido de una URL con manejo de errores.
+
+        Un 404/410 no se reintenta: devuelve None y la URL queda en self.gone_urls.
+        Con speculative=True (descargas por adelantado) la respuesta no se guarda en el
+        archivo WARC (ver _archive_response) y los fallos se registran solo en DEBUG.
+        """
+        if self.replay_index is not None:
+            return self._fetch_archived(url)
+
+        with self._timed('descarga (red + espera)', wait=True):
+            return self._fetch_with_retries(url, max_retries, method, data, params, json_data, speculative)
+
+    def _archive_response(self, url, response):
+        """Guarda una respuesta en el archivo WARC, si está activo."""
+        if self.archive is not None:
+            self.archive.write_response(url, response.status_code,
+                                        getattr(response, 'reason', None) or getattr(response, 'reason_phrase', ''),
+                                        response.headers, response.content)
+
+    def _fetch_with_retries(self, url, max_retries, method, data, params, json_data, speculative=False):
+        warning_level = logging.DEBUG if speculative else logging.WARNING
+        budget = self.budget
         retries = 0
         while retries < max_retries:
+            # Con presupuesto no se empieza una petición sin margen y el timeout no pasa del plazo
+            timeout = self.timeout
+            if budget:
+                if budget.exhausted():
+                    logger.debug("Presupuesto agotado: no se descarga {}".format(url))
+                    return None
+                remaining = budget.remaining_seconds()
+                if remaining is not None:
+                    timeout = max(0.5, min(timeout, remaining))
+
+            with self.lock:
+                self.request_count += 1
             try:
-                self._rotate_headers()
+                headers = self._rotate_headers()
                 proxy = self._get_random_proxy() if self.use_proxies else None
 
-                if method.upper() == "GET":
-                    response = self.session.get(url, timeout=self.timeout, proxies=proxy, params=params)
+                if self.http2_client is not None and not proxy:
+                    response = self._fetch_http2(url, method, headers, data=data, params=params,
+                                                 json_data=json_data, timeout=timeout)
+                elif method.upper() == "GET":
+                    response = self.session.get(url, timeout=timeout, proxies=proxy, params=params)
                 elif method.upper() == "POST":
-                    response = self.session.post(url, timeout=self.timeout, proxies=proxy, data=data, json=json_data)
+                    response = self.session.post(url, timeout=timeout, proxies=proxy, data=data, json=json_data)
                 else:
-                    response = self.session.request(method, url, timeout=self.timeout, proxies=proxy, 
+                    response = self.session.request(method, url, timeout=timeout, proxies=proxy,
                                                   data=data, json=json_data, params=params)
 
                 response.raise_for_status()
+                self._record_transfer(url, response)
+                if self.gone_urls and url in self.gone_urls:
+                    with self.lock:
+                        self.gone_urls.discard(url)
+                if not speculative and method.upper() == "GET":
+                    self._archive_response(url, response)
                 sleep_time = random.uniform(self.delay * 0.5, self.delay * 1.5)
                 time.sleep(sleep_time)
                 return response
 
-            except requests.exceptions.RequestException as e:
-                retries += 1
-                logger.warning("[!] Error accediendo a {}: {}. Reintento {}/{}".format(
-                    url, str(e)[:50], retries, max_retries))
-                time.sleep(random.uniform(2, 5))
+            except FETCH_ERRORS as e:
+                status = getattr(getattr(e, 'response', None), 'status_code', None)
+                if status in GONE_STATUSES:
+                    with self.lock:
+                        self.gone_urls.add(url)
+                    self.log_sampler.log(warning_level, (urlparse(url).netloc, status),
+                                         "[-] {} no existe ({})".format(url, status))
+                    return None
 
+                retries += 1
+                self.log_sampler.log(warning_level, (urlparse(url).netloc, type(e).__name__),
+                                     "[!] Error accediendo a {}: {}. Reintento {}/{}".format(
+                                         url, str(e)[:50], retries, max_retries))
                 if self.use_proxies and self.proxies and proxy and 'http' in proxy:
                     try:
                         proxy_addr = proxy['http'].replace('http://', '')
@@ -174,9 +1373,58 @@ class MegaScraper:
                     except:
                         pass
 
-        logger.error("[-] No se pudo acceder a {} después de {} intentos".format(url, max_retries))
+                if retries < max_retries:
+                    backoff = random.uniform(2, 5)
+                    remaining = budget.remaining_seconds() if budget else None
+                    if remaining is not None and remaining <= backoff:
+                        break  # el reintento ya no cabe en el plazo
+                    time.sleep(backoff)
+
+        self.log_sampler.log(logging.DEBUG if speculative else logging.ERROR, (urlparse(url).netloc, 'agotado'),
+                             "[-] No se pudo acceder a {} después de {} intentos".format(url, retries))
         return None
 
+    def _fetch_archived(self, url):
+        """Devuelve la respuesta archivada de una URL en modo reproducción."""
+        entry = self.replay_index.get(url)
+        if entry is None:
+            logger.warning("[!] {} no está en el archivo {}".format(url, self.replay_dir))
+            return None
+        try:
+            return WarcArchive.read_response(self.replay_dir, *entry)
+        except (OSError, EOFError, ValueError) as e:
+            logger.error("[-] Error leyendo {} del archivo: {}".format(url, str(e)[:50]))
+            return None
+
+    def replay_archive(self, selectors=None, link_pattern=None, table_selector=None, max_workers=None):
+        """Re-extrae el archivo WARC de replay_dir sin red, en paralelo por archivo.
+
+        Se procesa solo la respuesta más reciente de cada URL según index.tsv.
+        link_pattern='' extrae todos los enlaces; None no extrae enlaces. Los registros
+        quedan en self.data y se devuelve {'links': {url: [...]}, 'tables': {url: [...]}}.
+        """
+        by_file = {}
+        for filename, offset, length in self.replay_index.values():
+            by_file.setdefault(filename, []).append((offset, length))
+        files = sorted(by_file)
+        self.data = RecordStore(['url'] + list(selectors or ()))
+        links, tables = {}, {}
+        print("[*] Reprocesando {} URLs de {} archivos WARC...".format(len(self.replay_index), len(files)))
+
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker_logging) as executor:
+            n = len(files)
+            results = executor.map(_replay_warc_file, [self.replay_dir] * n, files,
+                                   [by_file[f] for f in files], [selectors] * n,
+                                   [link_pattern] * n, [table_selector] * n)
+            for file_data, file_links, file_tables in results:
+                self.data.extend(file_data)
+                links.update(file_links)
+                tables.update(file_tables)
+
+        print("[+] Reproceso completado. {} registros extraídos.".format(len(self.data)))
+        self.data.log_memory()
+        return {'links': links, 'tables': tables}
+
     def extract_data(self, url, selectors):
         """Extrae datos según selectores CSS proporcionados."""
         response = self.fetch_url(url)
@@ -184,31 +1432,64 @@ class MegaScraper:
             return None
 
         try:
-            soup = BeautifulSoup(response.content, 'html.parser')
-            data = {'url': url}
+            return self._extract_fields(None, url, selectors, content=response.content)
+            
+        except Exception as e:
+            logger.error("Error procesando {}: {}".format(url, str(e)[:50]))
+            return None
 
-            for field, selector in selectors.items():
+    def _extract_fields(self, soup, url, selectors, content=None):
+        """Aplica los selectores a una página.
+
+        Los selectores estructurados (jsonld:, json:, microdata:) se resuelven sobre
+        los bytes de la página; el DOM solo se construye si queda algún selector CSS.
+        """
+        data = {'url': url}
+        structured = None
+
+        for field, selector in selectors.items():
+            if is_structured_selector(selector):
                 try:
-                    elements = soup.select(selector)
-                    if not elements:
+                    with self._timed('estructurado {}: {}', field, selector):
+                        if structured is None:
+                            structured = StructuredData(content if content is not None else str(soup).encode('utf-8'),
+                                                        soup=soup, parse=self._parse)
+                        values = structured.resolve(selector)
+                    if not values:
                         data[field] = None
-                        continue
-
-                    if len(elements) > 1:
-                        data[field] = [el.get_text(strip=True) for el in elements[:10]]  # Limitar a 10
+                    elif len(values) > 1:
+                        data[field] = values[:10]  # Limitar a 10
                     else:
-                        data[field] = elements[0].get_text(strip=True)
-                        
+                        data[field] = values[0]
                 except Exception as e:
                     logger.error("Error extrayendo {} con selector {}: {}".format(
                         field, selector, str(e)[:30]))
                     data[field] = None
+                continue
 
-            return data
-            
-        except Exception as e:
-            logger.error("Error procesando {}: {}".format(url, str(e)[:50]))
-            return None
+            if soup is None:
+                # Reutiliza el DOM si ya lo construyó un selector microdata
+                soup = structured.soup if structured is not None and structured.soup is not None else self._parse(content)
+
+            try:
+                with self._timed('selector {}: {}', field, selector):
+                    elements = soup.select(selector)
+                if not elements:
+                    data[field] = None
+                    continue
+
+                with self._timed('texto {}', field):
+                    if len(elements) > 1:
+                        data[field] = [el.get_text(strip=True) for el in elements[:10]]  # Limitar a 10
+                    else:
+                        data[field] = elements[0].get_text(strip=True)
+                    
+            except Exception as e:
+                logger.error("Error extrayendo {} con selector {}: {}".format(
+                    field, selector, str(e)[:30]))
+                data[field] = None
+
+        return data
 
     def extract_links(self, url, link_pattern=None):
         """Extrae enlaces de una página web."""
@@ -217,88 +1498,729 @@ class MegaScraper:
             return []
 
         try:
-            soup = BeautifulSoup(response.content, 'html.parser')
-            base_url = urlparse(url).scheme + '://' + urlparse(url).netloc
-            links = []
-
-            if link_pattern:
-                elements = soup.select(link_pattern)
-                for element in elements:
-                    href = element.get('href')
-                    if href:
-                        full_url = urljoin(base_url, href)
-                        links.append(full_url)
-            else:
-                for a_tag in soup.find_all('a', href=True):
-                    href = a_tag.get('href')
-                    if href:
-                        full_url = urljoin(base_url, href)
-                        links.append(full_url)
-
-            # Filtrar enlaces internos únicos
-            internal_links = []
-            for link in links:
-                if (urlparse(link).netloc == urlparse(url).netloc and 
-                    link not in self.visited_urls and 
-                    link not in internal_links):
-                    internal_links.append(link)
-
-            return internal_links[:200]  # Limitar a 200 enlaces
+            return self._extract_page_links(None, url, link_pattern, content=response.content)
             
         except Exception as e:
             logger.error("Error extrayendo enlaces: {}".format(str(e)[:50]))
             return []
 
-    def crawl_website(self, start_url, selectors, max_pages=10, depth=2, link_pattern=None):
-        """Rastrea un sitio web recursivamente."""
-        self.data = []
+    def _extract_page_links(self, soup, url, link_pattern=None, content=None):
+        """Obtiene los enlaces internos no visitados de una página.
+
+        Sin link_pattern y con el contenido en bytes se usa scan_links, que no
+        construye el árbol; con link_pattern se usa el árbol de BeautifulSoup.
+        """
+        if link_pattern or content is None:
+            if soup is None:
+                soup = self._parse(content)
+            base_tag = soup.find('base', href=True)
+            base_href = base_tag.get('href') if base_tag else None
+            if link_pattern:
+                hrefs = [element.get('href') for element in soup.select(link_pattern)]
+            else:
+                hrefs = [a_tag.get('href') for a_tag in soup.find_all('a', href=True)]
+        else:
+            with self._timed('enlaces (escaneo)'):
+                base_href, hrefs = scan_links(content)
+
+        with self._timed('enlaces (filtrado)'):
+            return self._filter_links(url, base_href, hrefs)
+
+    def _filter_links(self, url, base_href, hrefs):
+        """Resuelve los href contra la URL base y conserva los internos únicos no visitados."""
+        # Los enlaces relativos se resuelven contra la ruta de la página o su <base href>
+        base = urljoin(url, base_href.strip()) if base_href else url
+        host = _url_host(url)
+        base_is_internal = _url_host(base) == host
+
+        internal_links = []
+        seen = set()
+        for href in hrefs:
+            if not href:
+                continue
+            href = href.strip()
+            link = urljoin(base, href)
+            if href.startswith('//') or _SCHEME_RE.match(href):
+                internal = _url_host(link) == host
+            else:
+                internal = base_is_internal
+            if internal and link not in seen and link not in self.visited_urls:
+                seen.add(link)
+                internal_links.append(link)
+                if len(internal_links) >= 200:  # Limitar a 200 enlaces
+                    break
+
+        return internal_links
+
+    # ------------------------------------------------------------------
+    # Descubrimiento por robots.txt y sitemaps
+    # ------------------------------------------------------------------
+
+    def _cache_path(self, key, extension):
+        """Ruta del archivo de caché asociado a una URL."""
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:20]
+        return os.path.join(self.cache_dir, digest + extension)
+
+    def _cache_is_fresh(self, path):
+        """Indica si un archivo de caché existe y no ha caducado."""
+        try:
+            return time.time() - os.path.getmtime(path) < self.cache_ttl
+        except OSError:
+            return False
+
+    def get_robots(self, url):
+        """Obtiene (reglas, sitemaps) del robots.txt del host de la URL, usando la caché."""
+        parsed = urlparse(url)
+        robots_url = "{}://{}/robots.txt".format(parsed.scheme, parsed.netloc)
+        if robots_url in self._robots:
+            return self._robots[robots_url]
+
+        path = self._cache_path(robots_url, '.robots.txt')
+        text = None
+        if self._cache_is_fresh(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                text = f.read()
+        else:
+            try:
+                with self.lock:
+                    self.request_count += 1
+                response = self.session.get(robots_url, timeout=self.timeout, headers=self._rotate_headers())
+                self._record_transfer(robots_url, response)
+                # Misma convención que RobotFileParser.read(): 401/403 prohíben todo y
+                # el resto de 4xx lo permiten. Un 5xx es temporal: prohíbe todo en esta
+                # ejecución pero no se guarda en la caché
+                if response.status_code == 200:
+                    text = response.text
+                elif response.status_code in (401, 403) or response.status_code >= 500:
+                    text = ROBOTS_DISALLOW_ALL
+                else:
+                    text = ''
+                if response.status_code < 500:
+                    os.makedirs(self.cache_dir, exist_ok=True)
+                    with open(path, 'w', encoding='utf-8') as f:
+                        f.write(text)
+                else:
+                    logger.warning("[!] {} respondió {}: se trata el host como prohibido".format(
+                        robots_url, response.status_code))
+            except requests.exceptions.RequestException as e:
+                logger.warning("[!] No se pudo leer {}: {}".format(robots_url, str(e)[:50]))
+                text = ''
+
+        lines = text.splitlines()
+        rules = RobotFileParser(robots_url)
+        rules.parse(lines)
+        sitemaps = []
+        for line in lines:
+            if line.lower().startswith('sitemap:'):
+                sitemaps.append(line.split(':', 1)[1].strip())
+
+        self._robots[robots_url] = (rules, sitemaps)
+        return rules, sitemaps
+
+    def is_allowed(self, url):
+        """Comprueba si robots.txt permite visitar la URL."""
+        rules, _ = self.get_robots(url)
+        return rules.can_fetch('*', url)
+
+    def _parse_sitemap(self, stream):
+        """Recorre un sitemap en streaming y produce (tipo, loc, lastmod) con memoria constante.
+
+        tipo es 'U' para una página (<url>) y 'S' para un sitemap hijo (<sitemap>).
+        """
+        root = None
+        loc = lastmod = None
+        for event, elem in ET.iterparse(stream, events=('start', 'end')):
+            if root is None:
+                root = elem
+            if event != 'end':
+                continue
+            tag = elem.tag.rsplit('}', 1)[-1]
+            if tag == 'loc':
+                loc = (elem.text or '').strip()
+            elif tag == 'lastmod':
+                lastmod = (elem.text or '').strip()
+            elif tag in ('url', 'sitemap'):
+                if loc:
+                    yield ('U' if tag == 'url' else 'S'), loc, lastmod or ''
+                loc = lastmod = None
+                root.clear()
+
+    def _open_sitemap(self, sitemap_url):
+        """Abre un sitemap remoto como flujo de bytes, descomprimiendo .gz si hace falta."""
+        with self.lock:
+            self.request_count += 1
+        response = self.session.get(sitemap_url, timeout=self.timeout, stream=True,
+                                    headers=self._rotate_headers())
+        response.raise_for_status()
+        response.raw.decode_content = True
+        response.raw.auto_close = False  # el BufferedReader necesita leer hasta EOF sin error
+        stream = io.BufferedReader(response.raw)
+        if stream.peek(2)[:2] == b'\x1f\x8b':
+            stream = gzip.GzipFile(fileobj=stream)
+        return response, stream
+
+    def _iter_sitemap_entries(self, sitemap_url):
+        """Produce las entradas de un sitemap desde la caché o desde la red (guardándolas)."""
+        path = self._cache_path(sitemap_url, '.sitemap.tsv')
+        if self._cache_is_fresh(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    kind, loc, lastmod = line.rstrip('\n').split('\t')
+                    yield kind, loc, lastmod
+            return
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = path + '.tmp'
+        completed = False
+        response, stream = self._open_sitemap(sitemap_url)
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as cache:
+                for kind, loc, lastmod in self._parse_sitemap(stream):
+                    cache.write("{}\t{}\t{}\n".format(kind, loc.replace('\t', ''), lastmod.replace('\t', '')))
+                    yield kind, loc, lastmod
+            completed = True
+        finally:
+            # Los bytes del sitemap cuentan para las estadísticas por host y para max_bytes.
+            # Solo se conoce el tamaño descomprimido de los .gz; si no, se usa el de la red
+            content_bytes = stream.tell() if isinstance(stream, gzip.GzipFile) else None
+            self._record_transfer(sitemap_url, response,
+                                  content_bytes=content_bytes or response.raw.tell())
+            response.close()
+            if completed:
+                os.replace(tmp_path, path)
+            elif os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def iter_sitemap_urls(self, sitemap_url, max_sitemaps=1000):
+        """Recorre un sitemap (o índice de sitemaps) y produce (url, lastmod) de cada página."""
+        pending = [sitemap_url]
+        seen = set()
+        while pending and len(seen) < max_sitemaps:
+            if self.budget and self.budget.exhausted():
+                logger.info("[!] Presupuesto agotado: se detiene la lectura de sitemaps")
+                break
+            current = pending.pop()
+            if current in seen:
+                continue
+            seen.add(current)
+            try:
+                for kind, loc, lastmod in self._iter_sitemap_entries(current):
+                    if kind == 'S':
+                        pending.append(loc)
+                    else:
+                        yield loc, lastmod
+            except (requests.exceptions.RequestException, ET.ParseError, OSError, EOFError) as e:
+                logger.warning("[!] Error leyendo sitemap {}: {}".format(current, str(e)[:50]))
+
+    def discover_urls(self, start_url, max_urls=None):
+        """Descubre URLs del sitio a partir de robots.txt y sus sitemaps.
+
+        Devuelve una lista de (url, lastmod) del mismo host, permitidas por robots.txt,
+        con las más recientes primero. Con max_urls solo se conservan las N más recientes.
+        """
+        rules, sitemaps = self.get_robots(start_url)
+        parsed = urlparse(start_url)
+        if not sitemaps:
+            sitemaps = ["{}://{}/sitemap.xml".format(parsed.scheme, parsed.netloc)]
+
+        def candidates():
+            seen = set()
+            for sitemap_url in sitemaps:
+                for loc, lastmod in self.iter_sitemap_urls(sitemap_url):
+                    if loc in seen or urlparse(loc).netloc != parsed.netloc:
+                        continue
+                    if not rules.can_fetch('*', loc):
+                        continue
+                    seen.add(loc)
+                    yield loc, lastmod
+
+        if max_urls:
+            found = heapq.nlargest(max_urls, candidates(), key=lambda item: item[1])
+        else:
+            found = sorted(candidates(), key=lambda item: item[1], reverse=True)
+
+        logger.info("[+] {} URLs descubiertas en sitemaps de {}".format(len(found), parsed.netloc))
+        return found
+
+    def scrape_page(self, url, selectors, link_pattern=None, expand_links=False):
+        """Descarga una página y devuelve (registro, enlaces) con un único parseo."""
+        response = self.fetch_url(url)
+        if not response:
+            return None, []
+
+        try:
+            soup = None
+            if link_pattern or any(not is_structured_selector(sel) for sel in selectors.values()):
+                soup = self._parse(response.content)
+            record = self._extract_fields(soup, url, selectors, content=response.content)
+            links = []
+            if expand_links:
+                links = self._extract_page_links(soup, url, link_pattern, content=response.content)
+            return record, links
+
+        except Exception as e:
+            logger.error("Error procesando {}: {}".format(url, str(e)[:50]))
+            return None, []
+
+    def crawl_website(self, start_url, selectors, max_pages=10, depth=2, link_pattern=None,
+                      use_sitemaps=False, skip_duplicates=False, max_distance=3,
+                      deadline=None, max_bytes=None, max_requests=None,
+                      output=None, checkpoint_file=None, resume_from=None, max_workers=1):
+        """Rastrea un sitio web recursivamente.
+
+        Con max_workers > 1 se descargan en paralelo lotes de hasta max_workers URLs de
+        la frontera; con http2=True comparten una conexión multiplexada por host. Las
+        peticiones del lote arrancan como mucho una cada `delay` segundos.
+
+        Con skip_duplicates se compara el texto principal de cada página (sin nav, header,
+        footer ni scripts) con los ya vistos: si coincide (hash exacto) la página no se
+        extrae ni se expanden sus enlaces; si casi coincide (SimHash de shingles a
+        distancia <= max_distance) se extrae pero no se expanden sus enlaces.
+
+        deadline (segundos), max_bytes y max_requests fijan un presupuesto: la frontera
+        se prioriza hacia los patrones de URL que más registros dan (por byte si hay
+        max_bytes), se omiten recursos pesados y, al agotarse, el crawling termina
+        guardando output (.csv/.json) y un checkpoint con las URLs pendientes, que
+        puede retomarse con resume_from. El plazo también limita el timeout y los
+        reintentos de cada descarga y la lectura de sitemaps. Al retomar, los registros
+        que ya hubiera en output se conservan y los nuevos se añaden a continuación.
+        """
+        self.data = RecordStore(['url'] + list(selectors))
         self.visited_urls = set()
-        urls_to_visit = [(start_url, 0)]
+        budget = CrawlBudget(self, deadline, max_bytes, max_requests)
+        urls_to_visit = CrawlFrontier(prioritized=bool(budget), per_byte=bool(max_bytes))
+        if resume_from:
+            with open(resume_from, 'r', encoding='utf-8') as f:
+                checkpoint = json.load(f)
+            self.visited_urls.update(checkpoint['visited'])
+            for url, url_depth in checkpoint['frontier']:
+                urls_to_visit.push(url, url_depth)
+            print("[*] Retomando checkpoint: {} URLs pendientes".format(len(urls_to_visit)))
+            if output and os.path.exists(output):
+                self.data.extend(self._load_output(output))
+                print("[*] Retomando con {} registros de {}".format(len(self.data), output))
+        else:
+            urls_to_visit.push(start_url, 0)
+        fingerprints = SimHashIndex(max_distance) if skip_duplicates else None
+        self.dedup_stats = {'exact': 0, 'near': 0, 'links_skipped': 0}
+        # El árbol DOM solo hace falta para selectores CSS, duplicados o filtro de enlaces
+        needs_dom = bool(skip_duplicates or link_pattern or
+                         any(not is_structured_selector(sel) for sel in selectors.values()))
+
+        # fetch_url y la lectura de sitemaps consultan el presupuesto en curso
+        self.budget = budget if budget else None
+        if use_sitemaps:
+            # Las páginas del sitemap entran como hojas: no hace falta expandir sus enlaces
+            for link, _ in self.discover_urls(start_url, max_urls=max_pages * 2):
+                if link != start_url:
+                    urls_to_visit.push(link, depth)
 
         print("[*] Iniciando crawling...")
+        if self.profiler:
+            self.profiler.begin_run()
         pages_processed = 0
+        progress = ProgressReporter(total=max_pages) if self.quiet else None
+        stop_reason = None
         
-        while urls_to_visit and pages_processed < max_pages:
-            current_url, current_depth = urls_to_visit.pop(0)
+        # Con max_workers > 1 las descargas de cada lote van en paralelo (streams
+        # HTTP/2 simultáneos o conexiones del pool); el procesado sigue en este hilo
+        executor = ThreadPoolExecutor(max_workers=max_workers) if max_workers > 1 else None
+        try:
+            while urls_to_visit and pages_processed < max_pages:
+                if budget:
+                    avg_page_time = budget.used()['seconds'] / pages_processed if pages_processed else 0.0
+                    stop_reason = budget.exhausted(avg_page_time)
+                    if stop_reason:
+                        break
 
-            if current_url in self.visited_urls:
-                continue
+                batch = []
+                while urls_to_visit and len(batch) < max_workers and pages_processed + len(batch) < max_pages:
+                    current_url, current_depth = urls_to_visit.pop()
+                    if current_url in self.visited_urls:
+                        continue
+                    if use_sitemaps and not self.is_allowed(current_url):
+                        continue
+                    self.visited_urls.add(current_url)
+                    batch.append((current_url, current_depth))
+                if not batch:
+                    continue
 
-            self.visited_urls.add(current_url)
-            pages_processed += 1
-            
-            print("[{}/{}] Procesando: {}".format(pages_processed, max_pages, current_url[:60] + "..."))
-            logger.info("Visitando {} (profundidad {})".format(current_url, current_depth))
+                if executor is not None and len(batch) > 1:
+                    responses = list(executor.map(self._paced_fetch, [url for url, _ in batch]))
+                else:
+                    responses = [self.fetch_url(url) for url, _ in batch]
 
-            item_data = self.extract_data(current_url, selectors)
-            if item_data:
-                self.data.append(item_data)
+                for (current_url, current_depth), response in zip(batch, responses):
+                    if not response and budget and budget.exhausted():
+                        # No se llegó a descargar por falta de presupuesto: queda pendiente
+                        self.visited_urls.discard(current_url)
+                        urls_to_visit.push(current_url, current_depth)
+                        continue
+                    pages_processed += 1
+
+                    if progress:
+                        progress.tick()
+                    else:
+                        print("[{}/{}] Procesando: {}".format(pages_processed, max_pages, current_url[:60] + "..."))
+                    logger.log(self._url_log_level, "Visitando {} (profundidad {})".format(current_url, current_depth))
 
-            if current_depth < depth:
-                links = self.extract_links(current_url, link_pattern)
-                for link in links:
-                    if link not in self.visited_urls and len(urls_to_visit) < max_pages * 2:
-                        urls_to_visit.append((link, current_depth + 1))
+                    if not response:
+                        if progress:
+                            progress.error()
+                        continue
 
+                    soup = None
+                    if needs_dom:
+                        try:
+                            soup = self._parse(response.content)
+                        except Exception as e:
+                            logger.error("Error procesando {}: {}".format(current_url, str(e)[:50]))
+                            continue
+
+                    duplicate = None
+                    if fingerprints is not None:
+                        with self._timed('huella de duplicados'):
+                            duplicate = fingerprints.check_and_add(content_text(soup), current_url)
+                        if duplicate:
+                            kind, original = duplicate
+                            self.dedup_stats[kind] += 1
+                            if current_depth < depth:
+                                self.dedup_stats['links_skipped'] += 1
+                            logger.log(self._url_log_level, "Duplicado ({}) de {}: {}".format(kind, original, current_url))
+                            # Solo un duplicado exacto se descarta; uno casi idéntico puede
+                            # ser otro producto con la misma plantilla y se extrae igualmente
+                            if kind == 'exact':
+                                continue
+
+                    record = self._extract_fields(soup, current_url, selectors, content=response.content)
+                    self.data.append(record)
+                    urls_to_visit.record(current_url, any(record[field] is not None for field in selectors),
+                                         len(response.content))
+
+                    if current_depth < depth and not duplicate:
+                        links = self._extract_page_links(soup, current_url, link_pattern, content=response.content)
+                        for link in links:
+                            if link not in self.visited_urls and len(urls_to_visit) < max_pages * 2:
+                                urls_to_visit.push(link, current_depth + 1)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+            self.budget = None
+
+        if progress:
+            progress.finish()
+        if stop_reason:
+            print("[!] Presupuesto agotado: {}. Terminando de forma ordenada.".format(stop_reason))
+        if urls_to_visit.skipped_heavy:
+            print("[+] Recursos pesados omitidos: {}".format(urls_to_visit.skipped_heavy))
+        if checkpoint_file and (stop_reason or urls_to_visit):
+            self._save_checkpoint(checkpoint_file, start_url, urls_to_visit, stop_reason)
+        if output:
+            if output.lower().endswith('.json'):
+                self.save_to_json(output)
+            else:
+                self.save_to_csv(output)
         print("[+] Crawling completado. {} páginas procesadas.".format(len(self.data)))
+        self.data.log_memory()
+        if self.profiler:
+            self.profiler.end_run("crawl")
+        if fingerprints is not None:
+            print("[+] Duplicados: {} exactos (no extraídos), {} casi idénticos (extraídos). "
+                  "Expansiones de enlaces ahorradas: {}.".format(
+                      self.dedup_stats['exact'], self.dedup_stats['near'],
+                      self.dedup_stats['links_skipped']))
+        self.log_transfer_stats()
+
+    # ------------------------------------------------------------------
+    # Paginación con prefetch especulativo
+    # ------------------------------------------------------------------
+
+    def _find_next_link(self, soup, url, next_selector=None):
+        """Busca el enlace a la página siguiente (selector dado, rel=next o texto típico)."""
+        candidates = soup.select(next_selector) if next_selector else soup.select('a[rel~=next], link[rel~=next]')
+        if not candidates and not next_selector:
+            for a_tag in soup.find_all('a', href=True):
+                text = a_tag.get_text(' ', strip=True).lower()
+                if text.startswith(NEXT_PAGE_TEXTS) or text in ('›', '»', '>', '→'):
+                    candidates = [a_tag]
+                    break
+        for element in candidates:
+            href = element.get('href')
+            if href:
+                base_tag = soup.find('base', href=True)
+                return urljoin(urljoin(url, base_tag['href']) if base_tag else url, href.strip())
+        return None
 
-    def crawl_multiple_urls(self, urls, selectors, max_workers=5):
-        """Extrae datos de múltiples URLs en paralelo."""
-        self.data = []
+    def _polite_wait(self):
+        """Espera el turno de la siguiente petición: como mucho una cada `delay` segundos."""
+        with self.lock:
+            now = time.time()
+            start = max(now, getattr(self, '_next_request_at', 0.0))
+            self._next_request_at = start + self.delay
+        if start > now:
+            time.sleep(start - now)
+
+    def _paced_fetch(self, url):
+        """fetch_url para descargas concurrentes: respeta `delay` entre inicios de petición."""
+        self._polite_wait()
+        return self.fetch_url(url)
+
+    def _fetch_listing_page(self, url, selectors, find_next, next_selector, speculative=False):
+        """Descarga y extrae una página de listado; devuelve (registro, siguiente URL, respuesta) o None.
+
+        Las especulativas no reintentan, no registran sus fallos salvo en DEBUG y no se
+        archivan hasta que se usan.
+        """
+        self._polite_wait()
+        response = self.fetch_url(url, max_retries=1 if speculative else 3, speculative=speculative)
+        if not response:
+            return None
+        try:
+            soup = None
+            if find_next or any(not is_structured_selector(sel) for sel in selectors.values()):
+                soup = self._parse(response.content)
+            record = self._extract_fields(soup, url, selectors, content=response.content)
+            next_url = self._find_next_link(soup, url, next_selector) if find_next else None
+            return record, next_url, response
+        except Exception as e:
+            logger.error("Error procesando {}: {}".format(url, str(e)[:50]))
+            return None
+
+    def crawl_pagination(self, start_url, selectors, next_selector=None, url_template=None,
+                         start_page=1, max_pages=50, prefetch=3):
+        """Recorre un listado paginado descargando por adelantado las siguientes páginas.
+
+        Con url_template ('https://x.com/lista?page={page}') las URLs se conocen de
+        antemano. Si no, se sigue el enlace next_selector (o rel=next / 'Siguiente'), y en
+        cuanto dos páginas consecutivas revelan un número de página en la URL se deduce
+        la plantilla. Con plantilla se piden hasta `prefetch` páginas siguientes en
+        paralelo, respetando `delay` entre el inicio de dos peticiones. El recorrido se
+        detiene en la primera página vacía, repetida o fallida; las especulativas
+        posteriores se descartan.
+        """
+        self.data = RecordStore(['url'] + list(selectors))
+        self.visited_urls = set()
+        find_next = url_template is None or next_selector is not None
+
+        page_url = None
+        page_number = None
+        page_step = 1
+        if url_template:
+            page_url = lambda n: url_template.format(page=n)
+            page_number = start_page
+            start_url = page_url(start_page)
+
+        futures = {}
+        signatures = set()
+        stats = {'speculative': 0, 'speculative_used': 0}
+        stop_reason = "límite de páginas"
+        current = start_url
+
+        print("[*] Iniciando paginación desde {}...".format(start_url[:60]))
+        executor = ThreadPoolExecutor(max_workers=prefetch + 1)
+        try:
+            def submit(url, speculative=False):
+                if url not in futures and url not in self.visited_urls:
+                    futures[url] = (executor.submit(self._fetch_listing_page, url, selectors,
+                                                    find_next, next_selector, speculative), speculative)
+                    if speculative:
+                        stats['speculative'] += 1
+
+            while len(self.data) < max_pages:
+                if current in self.visited_urls:
+                    stop_reason = "URL repetida"
+                    break
+                submit(current)
+                if page_url is not None:
+                    remaining = max_pages - len(self.data) - 1
+                    for k in range(1, min(prefetch, remaining) + 1):
+                        submit(page_url(page_number + k * page_step), speculative=True)
+
+                future, speculative = futures.pop(current)
+                result = future.result()
+                self.visited_urls.add(current)
+                gone = result is None and current in self.gone_urls
+                if speculative:
+                    stats['speculative_used'] += 1
+                    if result is None and not gone:
+                        # Solo un fallo transitorio se reintenta, ya sin especular
+                        result = self._fetch_listing_page(current, selectors, find_next, next_selector)
+                        gone = result is None and current in self.gone_urls
+                    elif result is not None:
+                        self._archive_response(current, result[2])
+                if result is None:
+                    # Un 404/410 tras la última página es el final normal del listado
+                    stop_reason = "fin del listado" if gone else "error al descargar"
+                    break
+
+                record, next_url, _ = result
+                values = {field: record[field] for field in selectors}
+                if all(value is None for value in values.values()):
+                    stop_reason = "página vacía"
+                    break
+                signature = RecordStateStore.record_hash(values)
+                if signature in signatures:
+                    stop_reason = "página repetida"
+                    break
+                signatures.add(signature)
+                self.data.append(record)
+                if not self.quiet:
+                    print("[{}/{}] Página: {}".format(len(self.data), max_pages, current[:60]))
+
+                if find_next and not next_url:
+                    stop_reason = "sin enlace a la página siguiente"
+                    break
+                if page_url is not None:
+                    predicted = page_url(page_number + page_step)
+                    if find_next and next_url != predicted:
+                        # La plantilla no coincide con el enlace real: se vuelve al modo serie
+                        logger.warning("[!] La paginación no sigue la plantilla; se sigue el enlace")
+                        page_url = None
+                        current = next_url
+                    else:
+                        page_number += page_step
+                        current = predicted
+                else:
+                    detected = detect_page_template(current, next_url)
+                    if detected:
+                        page_url, page_number, page_step = detected
+                        logger.info("[+] Patrón de paginación detectado: {}".format(page_url(page_number)))
+                    current = next_url
+        finally:
+            # Las especulativas sin usar se cancelan y se esperan las que ya están en curso
+            # (como mucho `prefetch`): no deben usar la sesión o el archivo tras close()
+            for future, _ in futures.values():
+                future.cancel()
+            executor.shutdown(wait=True)
+
+        wasted = stats['speculative'] - stats['speculative_used']
+        print("[+] Paginación terminada ({}). {} páginas extraídas, {} especulativas aprovechadas, "
+              "{} descartadas.".format(stop_reason, len(self.data), stats['speculative_used'], wasted))
+        self.log_transfer_stats()
+
+    def _save_checkpoint(self, filename, start_url, frontier, reason):
+        """Guarda las URLs pendientes y visitadas para poder retomar el crawling."""
+        checkpoint = {
+            'start_url': start_url,
+            'reason': reason,
+            'saved_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'frontier': frontier.items(),
+            'visited': sorted(self.visited_urls),
+        }
+        try:
+            tmp_path = filename + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(checkpoint, f, ensure_ascii=False)
+            os.replace(tmp_path, filename)
+            logger.info("[+] Checkpoint guardado en {} ({} URLs pendientes)".format(filename, len(frontier)))
+        except OSError as e:
+            logger.error("[-] Error guardando checkpoint: {}".format(e))
+
+    def crawl_multiple_urls(self, urls, selectors, max_workers=5, state_file=None, recrawl_interval=None):
+        """Extrae datos de múltiples URLs en paralelo.
+
+        Con state_file se activa el modo incremental: self.data solo contiene los
+        registros nuevos, modificados o eliminados respecto a la ejecución anterior,
+        marcados en el campo 'change' ('added', 'changed', 'removed'). Una URL que
+        responde 404/410 cuenta como eliminada; si falla por otro motivo conserva su
+        estado. Con recrawl_interval (segundos) se omiten las URLs comprobadas hace poco.
+        """
+        self.data = RecordStore(['url'] + list(selectors))
+        store = RecordStateStore(state_file) if state_file else None
+        previous = store.load() if store else {}
+        now = time.time()
+
+        if store and recrawl_interval:
+            pending = [url for url in urls if store.is_due(previous.get(url), recrawl_interval, now)]
+        else:
+            pending = list(urls)
         
+        progress = ProgressReporter(total=len(pending), label="URLs") if self.quiet else None
+        # Solo cuentan los 404/410 de esta ejecución
+        with self.lock:
+            self.gone_urls.difference_update(pending)
+
         def worker(url):
             data = self.extract_data(url, selectors)
             if data:
                 with self.lock:
                     self.data.append(data)
-                    print("[+] Extraído: {}".format(url[:50] + "..."))
-
-        print("[*] Procesando {} URLs en paralelo...".format(len(urls)))
+                    if not progress:
+                        print("[+] Extraído: {}".format(url[:50] + "..."))
+            elif progress:
+                progress.error()
+            if progress:
+                progress.tick()
+
+        print("[*] Procesando {} URLs en paralelo...".format(len(pending)))
+        if self.profiler:
+            self.profiler.begin_run()
         
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            executor.map(worker, urls)
+            executor.map(worker, pending)
+
+        if progress:
+            progress.finish()
+        if self.profiler:
+            self.profiler.end_run("multiple")
+
+        if store:
+            with self.lock:
+                gone = self.gone_urls.intersection(pending)
+            self.data = self._diff_records(store, previous, urls, selectors, now, gone)
+            self.diff_stats['skipped'] = len(urls) - len(pending)
+            store.close()
             
         print("[+] Procesamiento completado. {} elementos extraídos.".format(len(self.data)))
+        self.data.log_memory()
+        if store:
+            print("[+] Cambios: {added} nuevos, {changed} modificados, {removed} eliminados, "
+                  "{unchanged} sin cambios, {skipped} omitidos por intervalo.".format(**self.diff_stats))
+        self.log_transfer_stats()
+
+    def _diff_records(self, store, previous, urls, selectors, now, gone=()):
+        """Compara los registros extraídos con el estado guardado y lo actualiza.
+
+        gone son las URLs que respondieron 404/410 en esta ejecución.
+        """
+        self.diff_stats = {'added': 0, 'changed': 0, 'removed': 0, 'unchanged': 0, 'skipped': 0}
+        changes = RecordStore(['url'] + list(selectors) + ['change'])
+        updates = []
+
+        for record in self.data:
+            url = record['url']
+            digest = store.record_hash(record)
+            state = previous.get(url)
+            if state is None:
+                kind = 'added'
+            elif state[0] != digest:
+                kind = 'changed'
+            else:
+                kind = 'unchanged'
+            self.diff_stats[kind] += 1
+
+            if kind == 'unchanged':
+                backoff = min((state[2] or 1) * 2, store.max_backoff)
+            else:
+                backoff = 1
+                record = dict(record, change=kind)
+                changes.append(record)
+            updates.append((url, digest, now, backoff))
+
+        # Las URLs que ya no forman parte del trabajo o que ya no existen (404/410) se
+        # consideran eliminadas; las que fallaron por otro motivo u omitidas por
+        # intervalo conservan su estado anterior
+        current = set(urls)
+        removed = [url for url in previous if url not in current or url in gone]
+        for url in removed:
+            record = {'url': url}
+            record.update((field, None) for field in selectors)
+            record['change'] = 'removed'
+            changes.append(record)
+        self.diff_stats['removed'] = len(removed)
+
+        store.save(updates, removed)
+        return changes
 
     def save_to_csv(self, filename):
         """Guarda datos en formato CSV."""
@@ -310,13 +2232,19 @@ class MegaScraper:
             if HAS_PANDAS:
                 # Usar pandas si está disponible
                 import pandas as pd
-                df = pd.DataFrame(self.data)
+                if isinstance(self.data, RecordStore):
+                    df = pd.DataFrame.from_records(self.data.iter_rows(), columns=self.data.fields)
+                else:
+                    df = pd.DataFrame(self.data)
                 df.to_csv(filename, index=False, encoding='utf-8')
             else:
                 # Usar csv estándar
                 with open(filename, 'w', newline='', encoding='utf-8') as f:
                     if self.data:
-                        fieldnames = self.data[0].keys()
+                        if isinstance(self.data, RecordStore):
+                            fieldnames = self.data.fields
+                        else:
+                            fieldnames = self.data[0].keys()
                         writer = csv.DictWriter(f, fieldnames=fieldnames)
                         writer.writeheader()
                         for row in self.data:
@@ -334,6 +2262,14 @@ class MegaScraper:
         except Exception as e:
             logger.error("[-] Error guardando CSV: {}".format(e))
 
+    def _load_output(self, filename):
+        """Lee los registros de un output .csv/.json previo (para retomar un crawling)."""
+        with open(filename, 'r', encoding='utf-8', newline='') as f:
+            if filename.lower().endswith('.json'):
+                return json.load(f)
+            # En CSV las celdas vacías eran None al guardar
+            return [{k: (v if v != '' else None) for k, v in row.items()} for row in csv.DictReader(f)]
+
     def save_to_json(self, filename):
         """Guarda datos en formato JSON."""
         if not self.data:
@@ -342,7 +2278,15 @@ class MegaScraper:
 
         try:
             with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(self.data, f, ensure_ascii=False, indent=4)
+                if isinstance(self.data, RecordStore):
+                    # Escribe registro a registro para no materializar todos los dicts a la vez
+                    f.write('[')
+                    for i, record in enumerate(self.data):
+                        f.write(',\n' if i else '\n')
+                        f.write(textwrap.indent(json.dumps(record, ensure_ascii=False, indent=4), '    '))
+                    f.write('\n]')
+                else:
+                    json.dump(self.data, f, ensure_ascii=False, indent=4)
             logger.info("[+] Datos guardados en {}".format(filename))
         except Exception as e:
             logger.error("[-] Error guardando JSON: {}".format(e))
@@ -354,38 +2298,457 @@ class MegaScraper:
             return None
 
         try:
-            soup = BeautifulSoup(response.content, 'html.parser')
-            tables = soup.select(table_selector)
-
-            if not tables:
-                logger.warning("No se encontraron tablas con el selector {}".format(table_selector))
-                return None
-
-            all_tables = []
-            for i, table in enumerate(tables):
-                try:
-                    if HAS_PANDAS:
-                        # Usar pandas para leer tablas
-                        df = pd.read_html(str(table))[0]
-                        all_tables.append(df)
-                    else:
-                        # Extraer tabla manualmente
-                        rows = []
-                        for tr in table.find_all('tr'):
-                            row = [td.get_text(strip=True) for td in tr.find_all(['td', 'th'])]
-                            if row:
-                                rows.append(row)
-                        all_tables.append(rows)
-                except Exception as e:
-                    logger.error("Error procesando tabla {}: {}".format(i, str(e)[:30]))
-                    continue
-
-            return all_tables
+            soup = self._parse(response.content)
+            return self._extract_tables(soup, table_selector)
             
         except Exception as e:
             logger.error("Error extrayendo tablas: {}".format(str(e)[:50]))
             return None
 
+    def _extract_tables(self, soup, table_selector='table'):
+        """Convierte las tablas de una página ya parseada."""
+        tables = soup.select(table_selector)
+
+        if not tables:
+            logger.warning("No se encontraron tablas con el selector {}".format(table_selector))
+            return None
+
+        all_tables = []
+        for i, table in enumerate(tables):
+            try:
+                if HAS_PANDAS:
+                    # Usar pandas para leer tablas
+                    df = pd.read_html(str(table))[0]
+                    all_tables.append(df)
+                else:
+                    # Extraer tabla manualmente
+                    rows = []
+                    for tr in table.find_all('tr'):
+                        row = [td.get_text(strip=True) for td in tr.find_all(['td', 'th'])]
+                        if row:
+                            rows.append(row)
+                    all_tables.append(rows)
+            except Exception as e:
+                logger.error("Error procesando tabla {}: {}".format(i, str(e)[:30]))
+                continue
+
+        return all_tables
+
+# ============================================================================
+# PRESUPUESTOS Y FRONTERA PRIORIZADA
+# ============================================================================
+
+# Recursos pesados que nunca contienen registros: se omiten en crawlings con presupuesto
+HEAVY_EXTENSIONS = (
+    '.pdf', '.zip', '.gz', '.tgz', '.rar', '.7z', '.tar', '.exe', '.dmg', '.iso', '.apk',
+    '.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg', '.bmp', '.tif', '.tiff', '.ico',
+    '.mp3', '.mp4', '.avi', '.mov', '.mkv', '.webm', '.wav', '.ogg', '.flac',
+    '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx', '.csv', '.json', '.xml',
+)
+
+_DIGITS_RE = re.compile(r'\d+')
+
+
+def url_pattern(url):
+    """Plantilla de una URL para agrupar páginas similares: /p/123?x=1 -> /p/#?x."""
+    parts = urlsplit(url)
+    segments = [_DIGITS_RE.sub('#', segment) for segment in parts.path.split('/') if segment]
+    if len(segments) > 2:
+        segments = segments[:2] + ['*{}'.format(len(segments))]
+    query = ','.join(sorted(key.split('=', 1)[0] for key in parts.query.split('&') if key))
+    return '/' + '/'.join(segments) + ('?' + query if query else '')
+
+
+class CrawlBudget:
+    """
+    Límites de un crawling: tiempo de reloj, bytes descargados y número de peticiones.
+
+    exhausted() devuelve el motivo cuando se agota alguno; el plazo se considera
+    agotado si no queda tiempo para procesar otra página al ritmo medio actual.
+    """
+
+    def __init__(self, scraper, deadline=None, max_bytes=None, max_requests=None):
+        self.scraper = scraper
+        self.deadline = deadline
+        self.max_bytes = max_bytes
+        self.max_requests = max_requests
+        self.start = time.time()
+        self.start_bytes = scraper.total_wire_bytes()
+        self.start_requests = scraper.request_count
+
+    def __bool__(self):
+        return bool(self.deadline or self.max_bytes or self.max_requests)
+
+    def remaining_seconds(self):
+        """Segundos que quedan hasta el plazo, o None si no hay plazo."""
+        if not self.deadline:
+            return None
+        return self.deadline - (time.time() - self.start)
+
+    def used(self):
+        return {
+            'seconds': time.time() - self.start,
+            'bytes': self.scraper.total_wire_bytes() - self.start_bytes,
+            'requests': self.scraper.request_count - self.start_requests,
+        }
+
+    def exhausted(self, avg_page_time=0.0):
+        used = self.used()
+        if self.deadline and used['seconds'] + avg_page_time >= self.deadline:
+            return "tiempo ({:.0f}s)".format(self.deadline)
+        if self.max_bytes and used['bytes'] >= self.max_bytes:
+            return "bytes ({} KB)".format(self.max_bytes // 1024)
+        if self.max_requests and used['requests'] >= self.max_requests:
+            return "peticiones ({})".format(self.max_requests)
+        return None
+
+
+class CrawlFrontier:
+    """
+    Frontera de URLs pendientes: FIFO, o priorizada por el rendimiento esperado.
+
+    En modo priorizado cada patrón de URL (url_pattern) acumula páginas visitadas,
+    páginas con datos y bytes. La prioridad de un enlace es su tasa estimada de
+    registros (por KB si per_byte), menos una penalización por profundidad; las
+    prioridades se recalculan de forma perezosa al sacar cada URL.
+    """
+
+    def __init__(self, prioritized=False, per_byte=False):
+        self.prioritized = prioritized
+        self.per_byte = per_byte
+        self.pattern_stats = {}
+        self.skipped_heavy = 0
+        self._fifo = deque()
+        self._heap = []
+        self._counter = itertools.count()
+
+    def __len__(self):
+        return len(self._heap) if self.prioritized else len(self._fifo)
+
+    def score(self, url, depth):
+        pages, yielded, size = self.pattern_stats.get(url_pattern(url), (0, 0, 0))
+        # Estimación con prior optimista (1 de 2) para patrones poco vistos
+        rate = (yielded + 1.0) / (pages + 2.0)
+        if self.per_byte:
+            rate /= max(size / float(pages) if pages else 0.0, 1024.0) / 1024.0
+        return rate - 0.01 * depth
+
+    def push(self, url, depth):
+        if not self.prioritized:
+            self._fifo.append((url, depth))
+            return
+        if urlsplit(url).path.lower().endswith(HEAVY_EXTENSIONS):
+            self.skipped_heavy += 1
+            return
+        heapq.heappush(self._heap, (-self.score(url, depth), next(self._counter), url, depth))
+
+    def pop(self):
+        if not self.prioritized:
+            return self._fifo.popleft()
+        while True:
+            _, _, url, depth = heapq.heappop(self._heap)
+            current = -self.score(url, depth)
+            if not self._heap or current <= self._heap[0][0]:
+                return url, depth
+            heapq.heappush(self._heap, (current, next(self._counter), url, depth))
+
+    def record(self, url, yielded, size):
+        """Actualiza las estadísticas del patrón de una página procesada."""
+        stats = self.pattern_stats.setdefault(url_pattern(url), [0, 0, 0])
+        stats[0] += 1
+        stats[1] += 1 if yielded else 0
+        stats[2] += size
+
+    def items(self):
+        """URLs pendientes como lista de (url, profundidad), en orden de salida aproximado."""
+        if not self.prioritized:
+            return list(self._fifo)
+        return [(url, depth) for _, _, url, depth in sorted(self._heap)]
+
+
+# ============================================================================
+# PAGINACIÓN
+# ============================================================================
+
+# Textos habituales del enlace "página siguiente"
+NEXT_PAGE_TEXTS = ('siguiente', 'next', 'sig.', 'próxima', 'proxima', 'suivant', 'weiter')
+
+_NUMBER_SPLIT_RE = re.compile(r'(\d+)')
+
+
+def detect_page_template(url, next_url):
+    """Deduce la plantilla numérica de paginación a partir de dos URLs consecutivas.
+
+    Devuelve (función número -> URL, número de next_url, paso) si ambas URLs solo
+    difieren en un número que crece, o None.
+    """
+    parts = _NUMBER_SPLIT_RE.split(url)
+    next_parts = _NUMBER_SPLIT_RE.split(next_url)
+    if len(parts) != len(next_parts):
+        return None
+
+    changed = None
+    for i, (part, next_part) in enumerate(zip(parts, next_parts)):
+        if part == next_part:
+            continue
+        if i % 2 == 0 or changed is not None:
+            return None
+        changed = i
+    if changed is None:
+        return None
+
+    step = int(next_parts[changed]) - int(parts[changed])
+    if step <= 0:
+        return None
+    prefix = ''.join(next_parts[:changed])
+    suffix = ''.join(next_parts[changed + 1:])
+    return (lambda n: "{}{}{}".format(prefix, n, suffix)), int(next_parts[changed]), step
+
+
+# ============================================================================
+# PROGRAMADOR DE TRABAJOS
+# ============================================================================
+
+class ScrapeJob:
+    """
+    Trabajo para JobScheduler: un crawling (start_url) o un lote de URLs (urls).
+
+    weight reparte los hilos entre trabajos (un trabajo con peso 2 recibe el doble
+    de tiempo de hilo que uno con peso 1), max_concurrency limita sus peticiones
+    simultáneas y delay es la pausa mínima entre dos peticiones del trabajo (por
+    defecto la del programador). output es el archivo de salida (.json o .csv).
+    """
+
+    def __init__(self, name, selectors, start_url=None, urls=None, max_pages=10, depth=2,
+                 link_pattern=None, output=None, weight=1.0, max_concurrency=2, delay=None):
+        if not start_url and not urls:
+            raise ValueError("El trabajo {} necesita start_url o urls".format(name))
+        self.name = name
+        self.selectors = selectors
+        self.start_url = start_url
+        self.max_pages = max_pages if start_url else len(urls)
+        self.depth = depth
+        self.link_pattern = link_pattern
+        self.output = output
+        self.weight = float(weight)
+        self.max_concurrency = max_concurrency
+        self.delay = delay
+
+        # Estado de ejecución (lo gestiona el programador)
+        self.frontier = deque([(start_url, 0)] if start_url else [(url, 0) for url in urls])
+        self.scraper = None
+        self.progress = None
+        self.dispatched = 0
+        self.running = 0
+        self.virtual_time = 0.0
+        self.avg_task_time = 1.0
+        self.next_allowed = 0.0
+
+    @property
+    def kind(self):
+        return 'crawl' if self.start_url else 'batch'
+
+    def has_pending(self):
+        return bool(self.frontier) and self.dispatched < self.max_pages
+
+    def is_done(self):
+        return not self.has_pending() and self.running == 0
+
+
+class JobScheduler:
+    """
+    Ejecuta varios trabajos a la vez con un pool de hilos y un pool de conexiones comunes.
+
+    Cada petición se asigna al trabajo elegible con menor tiempo virtual
+    (tiempo de hilo consumido / peso), así un sitio lento consume su parte del
+    pool pero no la de los demás. Un trabajo es elegible si tiene URLs pendientes,
+    no ha alcanzado max_concurrency y ya pasó su delay desde la última petición.
+    """
+
+    def __init__(self, max_workers=10, delay=1.0, status_interval=5.0, **scraper_options):
+        self.max_workers = max_workers
+        self.delay = delay
+        self.status_interval = status_interval
+        # Un único archivo WARC para todos los trabajos (no uno por scraper)
+        archive_dir = scraper_options.pop('archive_dir', None)
+        self.archive = WarcArchive(archive_dir) if archive_dir else None
+        self.scraper_options = scraper_options
+        self.jobs = []
+        self.cond = threading.Condition()
+        # Un único adaptador = un único pool de conexiones para todas las sesiones
+        self.adapter = requests.adapters.HTTPAdapter(pool_connections=max_workers * 2,
+                                                     pool_maxsize=max_workers)
+        self.http2_client = None
+        self.stream_slots = {}
+
+    def add_job(self, job):
+        # Los nombres identifican los trabajos en run() y en su resultado
+        if any(other.name == job.name for other in self.jobs):
+            raise ValueError("Ya existe un trabajo llamado {}".format(job.name))
+        scraper = MegaScraper(delay=0, quiet=True, **self.scraper_options)
+        scraper.session.mount('http://', self.adapter)
+        scraper.session.mount('https://', self.adapter)
+        if scraper.http2_client is not None:
+            # También se comparte el cliente HTTP/2 (una conexión multiplexada por host)
+            # con los mismos semáforos, para que max_streams siga siendo un límite por host
+            if self.http2_client is None:
+                self.http2_client = scraper.http2_client
+            else:
+                scraper.http2_client.close()
+                scraper.http2_client = self.http2_client
+            scraper._stream_slots = self.stream_slots
+        scraper.archive = self.archive
+        scraper.data = RecordStore(['url'] + list(job.selectors))
+        job.scraper = scraper
+        if job.delay is None:
+            job.delay = self.delay
+        job.progress = ProgressReporter(total=job.max_pages, interval=float('inf'))
+        self.jobs.append(job)
+        return job
+
+    def _pick_job(self, now):
+        """Elige el próximo trabajo según la cola justa ponderada; devuelve (trabajo, espera)."""
+        best = None
+        wait = None
+        for job in self.jobs:
+            if not job.has_pending() or job.running >= job.max_concurrency:
+                continue
+            if job.next_allowed > now:
+                delay = job.next_allowed - now
+                wait = delay if wait is None else min(wait, delay)
+                continue
+            # Las peticiones en curso cuentan con su coste medio estimado
+            key = job.virtual_time + job.running * job.avg_task_time / job.weight
+            if best is None or key < best[0]:
+                best = (key, job)
+        return (best[1] if best else None), wait
+
+    def _next_url(self, job):
+        while job.frontier:
+            url, depth = job.frontier.popleft()
+            if url not in job.scraper.visited_urls:
+                job.scraper.visited_urls.add(url)
+                return url, depth
+        return None, None
+
+    def _run_task(self, job, url, depth):
+        start = time.time()
+        expand = job.kind == 'crawl' and depth < job.depth
+        try:
+            record, links = job.scraper.scrape_page(url, job.selectors, job.link_pattern, expand_links=expand)
+        except Exception as e:
+            logger.error("[{}] Error procesando {}: {}".format(job.name, url, str(e)[:50]))
+            record, links = None, []
+        elapsed = time.time() - start
+
+        with self.cond:
+            job.running -= 1
+            job.virtual_time += elapsed / job.weight
+            job.avg_task_time = 0.8 * job.avg_task_time + 0.2 * elapsed
+            if record:
+                job.scraper.data.append(record)
+            else:
+                job.progress.error()
+            job.progress.tick()
+            for link in links:
+                if len(job.frontier) >= job.max_pages * 2:
+                    break
+                if link not in job.scraper.visited_urls:
+                    job.frontier.append((link, depth + 1))
+            self.cond.notify_all()
+
+    def print_status(self):
+        """Muestra el progreso y la ETA de cada trabajo."""
+        print("\n>>> ESTADO DE LOS TRABAJOS")
+        for job in self.jobs:
+            state = "✔" if job.is_done() else "{} en curso".format(job.running)
+            print("  [{}] {} ({})".format(job.name, job.progress.status(), state))
+
+    def _finish_job(self, job):
+        job.progress.stop()
+        print("[+] Trabajo '{}' completado: {} registros".format(job.name, len(job.scraper.data)))
+        if job.output:
+            if job.output.lower().endswith('.json'):
+                job.scraper.save_to_json(job.output)
+            else:
+                job.scraper.save_to_csv(job.output)
+
+    def _dispatch(self, executor, now):
+        """Lanza la siguiente petición o espera a un hilo libre o a un delay (con self.cond tomado)."""
+        running = sum(job.running for job in self.jobs)
+        job, wait = self._pick_job(now) if running < self.max_workers else (None, None)
+        if job is None:
+            timeout = self.status_interval if wait is None else min(wait, self.status_interval)
+            self.cond.wait(timeout)
+            return
+
+        url, depth = self._next_url(job)
+        if url is None:
+            return
+        # Un trabajo que vuelve tras estar inactivo no acumula crédito atrasado
+        active = [j.virtual_time for j in self.jobs if j.running and j is not job]
+        if active and job.running == 0:
+            job.virtual_time = max(job.virtual_time, min(active))
+        job.running += 1
+        job.dispatched += 1
+        job.next_allowed = now + job.delay
+        executor.submit(self._run_task, job, url, depth)
+
+    def run(self):
+        """Ejecuta todos los trabajos y devuelve {nombre: registros}."""
+        print("[*] Ejecutando {} trabajos con {} hilos compartidos...".format(len(self.jobs), self.max_workers))
+        finished = set()
+        last_status = time.time()
+
+        saves = []
+
+        # Las salidas se guardan en un hilo aparte y sin el lock: ni los trabajadores
+        # ni el reparto de peticiones esperan a que se escriba un CSV/JSON grande
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor, \
+                ThreadPoolExecutor(max_workers=1) as saver:
+            while len(finished) < len(self.jobs):
+                with self.cond:
+                    now = time.time()
+                    completed = [job for job in self.jobs if job.name not in finished and job.is_done()]
+                    finished.update(job.name for job in completed)
+
+                    if now - last_status >= self.status_interval:
+                        last_status = now
+                        self.print_status()
+
+                    if not completed:
+                        self._dispatch(executor, now)
+
+                for job in completed:
+                    saves.append(saver.submit(self._finish_job, job))
+
+        for future in saves:
+            future.result()
+        self.print_status()
+        return {job.name: job.scraper.data for job in self.jobs}
+
+    def close(self):
+        """Cierra las sesiones de los trabajos, el cliente HTTP/2 y el archivo compartidos."""
+        for job in self.jobs:
+            job.scraper.session.close()
+        if self.http2_client is not None:
+            self.http2_client.close()
+        if self.archive is not None:
+            self.archive.close()
+
+
+def load_jobs(path):
+    """Lee una lista de trabajos desde un JSON: [{"name": ..., "selectors": {...}, ...}, ...]."""
+    with open(path, 'r', encoding='utf-8') as f:
+        specs = json.load(f)
+    jobs = [ScrapeJob(**spec) for spec in specs]
+    names = Counter(job.name for job in jobs)
+    repeated = sorted(name for name, count in names.items() if count > 1)
+    if repeated:
+        raise ValueError("Nombres de trabajo repetidos: {}".format(', '.join(repeated)))
+    return jobs
+
+
 # ============================================================================
 # FUNCIONES DE INTERFAZ DE USUARIO
 # ============================================================================
@@ -445,6 +2808,21 @@ def mostrar_menu():
     print("    └ Ejemplo: Encontrar todos los productos de una categoría")
     print("    └ Uso: Lista completa de enlaces para usar después")
     print("")
+    print("6️⃣  REPROCESAR ARCHIVO WARC")
+    print("    └ Ideal para: Cambiar selectores sin volver a descargar el sitio")
+    print("    └ Ejemplo: Añadir un campo nuevo a un crawling de ayer")
+    print("    └ Uso: Sin red, en paralelo sobre las respuestas archivadas")
+    print("")
+    print("7️⃣  PROGRAMADOR DE TRABAJOS")
+    print("    └ Ideal para: Muchos sitios en una sola ejecución (p. ej. de noche)")
+    print("    └ Ejemplo: 30 tiendas, cada una con sus selectores y su archivo de salida")
+    print("    └ Uso: Lee los trabajos de un JSON y reparte los hilos de forma justa")
+    print("")
+    print("8️⃣  SEGUIR PAGINACIÓN")
+    print("    └ Ideal para: Listados y catálogos con páginas 1, 2, 3...")
+    print("    └ Ejemplo: Todas las páginas de una categoría de tienda")
+    print("    └ Uso: Sigue el enlace 'Siguiente' y descarga por adelantado las próximas")
+    print("")
     print("0️⃣  SALIR")
     print("    └ Terminar el programa")
     print("")
@@ -501,15 +2879,53 @@ def get_user_input():
     timeout_input = input("Timeout por request en segundos [15]: ").strip()
     timeout = int(timeout_input) if timeout_input else 15
 
+    # Configuración de HTTP/2
+    http2 = False
+    if HAS_HTTP2:
+        print("\n━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
+        print("🚄 TRANSPORTE HTTP/2")
+        print("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
+        print("")
+        print("💡 ¿Qué es HTTP/2?")
+        print("   Envía muchas peticiones por UNA sola conexión con el servidor:")
+        print("   ✓ Ideal para crawlings grandes de un mismo sitio")
+        print("   ✓ Menos conexiones TCP/TLS que abrir")
+        print("   • Con proxies activados se usa HTTP/1.1")
+        print("")
+        http2 = input("¿Usar HTTP/2? (s/n) [n]: ").lower().startswith('s')
+
+    # Modo silencioso
+    print("\n━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
+    print("🔇 MODO SILENCIOSO")
+    print("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
+    print("")
+    print("💡 En lugar de una línea por URL muestra un resumen periódico")
+    print("   (páginas, velocidad, errores y tiempo restante). Útil para trabajos grandes.")
+    print("")
+    quiet = input("¿Activar modo silencioso? (s/n) [n]: ").lower().startswith('s')
+
+    # Archivo de respuestas
+    print("\n━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
+    print("📦 ARCHIVO DE RESPUESTAS (WARC)")
+    print("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
+    print("")
+    print("💡 Guarda cada página descargada (comprimida) en una carpeta")
+    print("   para poder re-extraer datos después sin volver a descargar (opción 6)")
+    print("")
+    archive_dir = input("Carpeta para archivar respuestas [vacío = no archivar]: ").strip() or None
+
     # Mostrar menú de opciones
     mostrar_menu()
     
-    choice = input("👉 Selecciona una opción (1-5, 0 para salir): ").strip()
+    choice = input("👉 Selecciona una opción (1-8, 0 para salir): ").strip()
 
     return {
         'use_proxies': use_proxies,
         'delay': delay,
         'timeout': timeout,
+        'http2': http2,
+        'archive_dir': archive_dir,
+        'quiet': quiet,
         'choice': choice
     }
 
@@ -551,6 +2967,12 @@ def configure_selectors():
     print("       img                   → Todas las imágenes")
     print("       .product-image        → Imágenes de productos")
     print("")
+    print("   🧩 DATOS ESTRUCTURADOS (más rápido, no necesita CSS):")
+    print("       jsonld:$.offers.price → Precio en el JSON-LD de la página")
+    print("       jsonld:$..sku         → Cualquier 'sku' dentro del JSON-LD")
+    print("       json:__NEXT_DATA__:$.props.pageProps.title → JSON embebido por id")
+    print("       microdata:price       → Elementos con itemprop='price'")
+    print("")
     print("💡 CONSEJO PRO:")
     print("   1. Ve al sitio web en tu navegador")
     print("   2. Presiona F12 para abrir DevTools")
@@ -691,7 +3113,10 @@ def main():
             scraper = MegaScraper(
                 use_proxies=config['use_proxies'],
                 delay=config['delay'],
-                timeout=config['timeout']
+                timeout=config['timeout'],
+                http2=config['http2'],
+                archive_dir=config['archive_dir'],
+                quiet=config['quiet']
             )
             print("✅ Scraper configurado correctamente!")
 
@@ -774,9 +3199,26 @@ def main():
                 print("   • Ejemplo: a.product-link (solo enlaces de productos)")
                 link_pattern = input("🎯 Selector de enlaces: ").strip() or None
 
+                print("🗺️  Descubrimiento por sitemap:")
+                print("   • Lee robots.txt y los sitemaps del sitio")
+                print("   • Visita directamente las páginas listadas (más recientes primero)")
+                print("   • Respeta las reglas de robots.txt")
+                use_sitemaps = input("¿Usar sitemaps para descubrir páginas? (s/n) [n]: ").lower().startswith('s')
+
+                print("🧬 Detección de duplicados:")
+                print("   • Omite páginas con el mismo contenido (filtros, orden, parámetros de sesión)")
+                print("   • No extrae datos de las páginas idénticas ni sigue enlaces de las casi idénticas")
+                skip_duplicates = input("¿Omitir páginas duplicadas? (s/n) [n]: ").lower().startswith('s')
+
+                print("⚡ Descargas simultáneas (con HTTP/2 comparten una sola conexión):")
+                workers_input = input("🔥 Descargas simultáneas [1]: ").strip()
+                crawl_workers = int(workers_input) if workers_input else 1
+
                 print("\n🕷️  Iniciando crawling...")
                 print("⏳ Esto puede tomar varios minutos dependiendo del sitio...")
-                scraper.crawl_website(start_url, selectors, max_pages, depth, link_pattern)
+                scraper.crawl_website(start_url, selectors, max_pages, depth, link_pattern,
+                                      use_sitemaps=use_sitemaps, skip_duplicates=skip_duplicates,
+                                      max_workers=crawl_workers)
 
                 if scraper.data:
                     print("\n🎉 ¡Crawling completado!")
@@ -832,8 +3274,18 @@ def main():
                 max_workers_input = input("🔥 Número de hilos paralelos [5]: ").strip()
                 max_workers = int(max_workers_input) if max_workers_input else 5
 
+                print("\n🔁 MODO INCREMENTAL (opcional):")
+                print("💡 Guarda el estado de cada URL para emitir solo registros nuevos,")
+                print("   modificados o eliminados respecto a la ejecución anterior")
+                state_file = input("💾 Archivo de estado [vacío = desactivado]: ").strip() or None
+                recrawl_interval = None
+                if state_file:
+                    interval_input = input("⏳ Horas mínimas entre visitas a una misma URL [0]: ").strip()
+                    recrawl_interval = float(interval_input) * 3600 if interval_input else None
+
                 print("\n⚡ Procesando {} URLs con {} hilos...".format(len(urls), max_workers))
-                scraper.crawl_multiple_urls(urls, selectors, max_workers)
+                scraper.crawl_multiple_urls(urls, selectors, max_workers, state_file=state_file,
+                                            recrawl_interval=recrawl_interval)
 
                 if scraper.data:
                     print("\n🎉 ¡Extracción múltiple completada!")
@@ -968,10 +3420,124 @@ def main():
                     print("   • La página no tiene enlaces")
                     print("   • Los enlaces se cargan con JavaScript")
 
+            # Opción 6: Reprocesar un archivo WARC sin red
+            elif config['choice'] == '6':
+                print("\n" + "📦" * 15 + " REPROCESAR ARCHIVO WARC " + "📦" * 15)
+                print("")
+                print("📦 Vas a re-extraer datos de páginas ya archivadas")
+                print("⚡ No se hace ninguna petición: todo sale del archivo local")
+                print("")
+
+                replay_dir = input("📁 Carpeta del archivo WARC: ").strip()
+                if not replay_dir or not os.path.isdir(replay_dir):
+                    print("❌ Carpeta no válida")
+                    continue
+
+                selectors = configure_selectors()
+                if not selectors:
+                    print("❌ Se necesitan selectores")
+                    continue
+
+                scraper.close()
+                scraper = MegaScraper(delay=0, replay_dir=replay_dir)
+                print("\n⚡ Reprocesando archivo...")
+                scraper.replay_archive(selectors)
+
+                if scraper.data:
+                    print("\n🎉 ¡Reproceso completado!")
+                    print("📊 Datos extraídos de {} páginas".format(len(scraper.data)))
+                    show_sample_data(scraper.data)
+                    save_data(scraper, "reproceso_warc")
+                else:
+                    print("❌ El archivo no contiene páginas")
+
+            # Opción 7: Varios trabajos con hilos compartidos
+            elif config['choice'] == '7':
+                print("\n" + "🗂️" * 15 + " PROGRAMADOR DE TRABAJOS " + "🗂️" * 15)
+                print("")
+                print("📋 Vas a ejecutar VARIOS trabajos a la vez desde un archivo JSON")
+                print("💡 Formato: lista de trabajos, por ejemplo:")
+                print('   [{"name": "tienda1", "start_url": "https://tienda1.com",')
+                print('     "selectors": {"titulo": "h1"}, "max_pages": 100, "output": "tienda1.csv"},')
+                print('    {"name": "lote", "urls": ["https://a.com/1", "https://a.com/2"],')
+                print('     "selectors": {"precio": ".price"}, "weight": 2, "max_concurrency": 4}]')
+                print("")
+
+                jobs_file = input("📁 Archivo JSON de trabajos: ").strip()
+                try:
+                    jobs = load_jobs(jobs_file)
+                except (OSError, ValueError, TypeError) as e:
+                    print("❌ No se pudieron leer los trabajos: {}".format(e))
+                    continue
+
+                max_workers_input = input("🔥 Hilos compartidos entre todos los trabajos [10]: ").strip()
+                max_workers = int(max_workers_input) if max_workers_input else 10
+
+                scheduler = JobScheduler(max_workers=max_workers, delay=config['delay'],
+                                         use_proxies=config['use_proxies'], timeout=config['timeout'],
+                                         http2=config['http2'], archive_dir=config['archive_dir'])
+                for job in jobs:
+                    scheduler.add_job(job)
+                try:
+                    scheduler.run()
+                finally:
+                    scheduler.close()
+                print("\n🎉 ¡Trabajos completados!")
+
+            # Opción 8: Seguir la paginación de un listado
+            elif config['choice'] == '8':
+                print("\n" + "📑" * 15 + " SEGUIR PAGINACIÓN " + "📑" * 15)
+                print("")
+                print("📑 Vas a recorrer TODAS las páginas de un listado")
+                print("💡 Se detiene sola en la primera página vacía o repetida")
+                print("")
+
+                print("🔗 Dos formas de indicar las páginas:")
+                print("   • URL de la primera página (se sigue el enlace 'Siguiente')")
+                print("   • Plantilla con {page}: https://tienda.com/lista?page={page}")
+                start_url = input("🌐 URL o plantilla: ").strip()
+                if not start_url.startswith(('http://', 'https://')):
+                    print("❌ URL inválida. Debe empezar con http:// o https://")
+                    continue
+                url_template = start_url if '{page}' in start_url else None
+
+                selectors = configure_selectors()
+                if not selectors:
+                    print("❌ Se necesitan selectores")
+                    continue
+
+                next_selector = None
+                if url_template is None:
+                    print("🎯 Selector del enlace 'Siguiente' (opcional):")
+                    print("   • Déjalo vacío para detectarlo solo (rel=next, 'Siguiente', 'Next', '»')")
+                    next_selector = input("🎯 Selector: ").strip() or None
+
+                max_pages_input = input("📄 Máximo número de páginas [50]: ").strip()
+                max_pages = int(max_pages_input) if max_pages_input else 50
+
+                print("⚡ Páginas a descargar por adelantado (respetando el delay) [3]:")
+                prefetch_input = input("⚡ Prefetch: ").strip()
+                prefetch = int(prefetch_input) if prefetch_input else 3
+
+                print("\n📑 Recorriendo páginas...")
+                scraper.crawl_pagination(None if url_template else start_url, selectors,
+                                         next_selector=next_selector, url_template=url_template,
+                                         max_pages=max_pages, prefetch=prefetch)
+
+                if scraper.data:
+                    print("\n🎉 ¡Paginación completada!")
+                    print("📊 Se extrajeron datos de {} páginas".format(len(scraper.data)))
+                    show_sample_data(scraper.data)
+                    save_data(scraper, "paginacion")
+                else:
+                    print("❌ No se pudieron extraer datos del listado")
+
             else:
                 print("\n❌ Opción no válida")
                 continue
             
+            scraper.close()
+
             # Preguntar si quiere hacer otra operación
             print("\n" + "🔄" * 20)
             otra_operacion = input("¿Quieres realizar otra extracción? (s/n): ").lower().startswith('s')
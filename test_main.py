@@ -0,0 +1,150 @@
+"""Pruebas unitarias de los componentes de main.py que no necesitan red."""
+
+import random
+
+import pytest
+from bs4 import BeautifulSoup
+
+from main import SimHashIndex, StructuredData, content_text, jsonpath, simhash
+
+
+# ============================================================================
+# JSONPATH
+# ============================================================================
+
+DOCUMENT = {
+    'name': 'Producto',
+    'offers': [{'price': '10', 'currency': 'EUR'}, {'price': '12'}],
+    '@graph': [{'@type': 'Organization', 'name': 'Tienda'}],
+    'weird key': {'x': 1},
+}
+
+
+def test_jsonpath_child_and_index():
+    assert jsonpath(DOCUMENT, '$.name') == ['Producto']
+    assert jsonpath(DOCUMENT, '$.offers[1].price') == ['12']
+    assert jsonpath(DOCUMENT, '$.offers[5]') == []
+
+
+def test_jsonpath_lists_are_traversed_implicitly():
+    assert jsonpath(DOCUMENT, '$.offers.price') == ['10', '12']
+    assert jsonpath(DOCUMENT, 'offers.currency') == ['EUR']
+
+
+def test_jsonpath_wildcard_and_descendants():
+    assert jsonpath(DOCUMENT, '$.offers[*].price') == ['10', '12']
+    assert jsonpath(DOCUMENT, '$..name') == ['Producto', 'Tienda']
+    assert jsonpath({'a': {'b': 1}}, '$.a.*') == [1]
+
+
+def test_jsonpath_quoted_keys():
+    assert jsonpath(DOCUMENT, "$['weird key'].x") == [1]
+    assert jsonpath(DOCUMENT, '$["@graph"][0]["@type"]') == ['Organization']
+
+
+def test_jsonpath_rejects_invalid_paths():
+    with pytest.raises(ValueError):
+        jsonpath(DOCUMENT, '$.offers[')
+    with pytest.raises(ValueError):
+        jsonpath(DOCUMENT, '$.a b')
+
+
+# ============================================================================
+# DATOS ESTRUCTURADOS
+# ============================================================================
+
+PAGE = b'''<html><head>
+<script type="application/ld+json">{"@type": "Product", "offers": {"price": 19.5, "priceCurrency": "EUR"}}</script>
+<script id="__NEXT_DATA__" type="application/json">{"props": {"title": "Hola"}}</script>
+</head><body>
+<div itemscope>
+  <span itemprop="low-price">3</span>
+  <span itemprop="price">10</span>
+  <meta itemprop="availability" content="InStock">
+  <a itemprop="url author" href="/autor">Autor</a>
+  <span itemprop="name"><b>Nested</b> name</span>
+  <p itemprop="description">A &amp; B</p>
+</div>
+</body></html>'''
+
+
+def test_resolve_jsonld_and_embedded_json():
+    data = StructuredData(PAGE)
+    assert data.resolve('jsonld:$.offers.price') == ['19.5']
+    assert data.resolve('jsonld:$.offers') == ['{"price": 19.5, "priceCurrency": "EUR"}']
+    assert data.resolve('json:__NEXT_DATA__:$.props.title') == ['Hola']
+    assert data.resolve('json:missing:$.a') == []
+
+
+def test_resolve_microdata_matches_whole_itemprop_tokens():
+    data = StructuredData(PAGE)
+    assert data.resolve('microdata:price') == ['10']
+    assert data.resolve('microdata:low-price') == ['3']
+    assert data.resolve('microdata:author') == ['/autor']
+    assert data.resolve('microdata:url') == ['/autor']
+
+
+def test_resolve_microdata_attribute_and_text_values():
+    data = StructuredData(PAGE)
+    assert data.resolve('microdata:availability') == ['InStock']
+    assert data.resolve('microdata:description') == ['A & B']
+    assert data.resolve('microdata:missing') == []
+
+
+def test_resolve_microdata_nested_markup_uses_dom():
+    data = StructuredData(PAGE)
+    assert data.soup is None
+    assert data.resolve('microdata:name') == ['Nestedname']
+    assert data.soup is not None
+
+
+# ============================================================================
+# DETECCIÓN DE DUPLICADOS
+# ============================================================================
+
+def _words(rng, count, vocabulary=5000):
+    return ' '.join('w{}'.format(rng.randrange(vocabulary)) for _ in range(count))
+
+
+def _product_page(n, chrome, unique):
+    third = len(chrome) // 3
+    return ('<html><head><script>var n = {n};</script></head><body>'
+            '<header>{}</header><nav>{}</nav>'
+            '<main><h1>Producto {n}</h1><p>Precio {n}. {}</p></main>'
+            '<footer>{}</footer></body></html>').format(
+                chrome[:third], chrome[third:2 * third], unique, chrome[2 * third:], n=n)
+
+
+def test_content_text_skips_boilerplate_without_modifying_the_tree():
+    soup = BeautifulSoup('<html><body><nav>menú</nav><h1>Hola</h1><!-- nota -->'
+                         '<p>uno <b>dos</b></p><footer>pie</footer></body></html>', 'html.parser')
+    assert content_text(soup) == 'Hola uno dos'
+    assert soup.find('nav') is not None
+
+
+def test_simhash_index_detects_exact_and_near_duplicates():
+    rng = random.Random(3)
+    text = _words(rng, 600)
+    index = SimHashIndex(max_distance=3)
+    assert index.check_and_add(text, 'a') is None
+    assert index.check_and_add(text, 'b') == ('exact', 'a')
+    assert index.check_and_add(text + ' generado w1', 'c') == ('near', 'a')
+
+
+def test_simhash_index_does_not_flag_distinct_pages_sharing_a_template():
+    rng = random.Random(1)
+    chrome = _words(rng, 400)
+    index = SimHashIndex(max_distance=3)
+    flagged = 0
+    for n in range(200):
+        soup = BeautifulSoup(_product_page(n, chrome, _words(rng, 20)), 'html.parser')
+        if index.check_and_add(content_text(soup), str(n)):
+            flagged += 1
+    assert flagged == 0
+
+
+def test_simhash_is_stable_and_separates_unrelated_texts():
+    rng = random.Random(5)
+    first, second = _words(rng, 300), _words(rng, 300)
+    assert simhash(first) == simhash(first)
+    assert bin(simhash(first) ^ simhash(second)).count('1') > 10